@@ -0,0 +1,250 @@
+"""Offline benchmark of the audio transcription pipeline.
+
+Runs synthetic recordings through spooling, optional silence trimming, splitting
+and chunk transcription against a local Whisper stub, no network or MongoDB needed:
+
+    python -m benchmarks.audio_pipeline [--minutes 1 10 60] [--latency-ms 500]
+        [--latency-ms-per-mb 200] [--profile opus_mono_16k] [--disk-chunks]
+        [--trim-silences] [--json out.json]
+
+Every recording runs in a fresh process so peak RSS isn't carried over. Reports:
+- split_s: ffprobe, silence detection and chunk extraction
+- written_mb: bytes of scratch files (spool and temp/), sampled every 20 ms
+- uploaded_mb: request bytes received by the Whisper stub
+- rss_mb / ffmpeg_rss_mb: peak RSS of the server process and of the largest ffmpeg child
+- blocked_ms / max_block_ms: event loop lag above 5 ms, summed and worst case
+- total_s: end-to-end latency from upload to joined transcript
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.synthetic_audio import generate_recording
+from benchmarks.whisper_stub import WhisperStubServer
+
+# Required settings, nothing is connected to during the benchmark
+BENCHMARK_ENV = {
+    "OPENAI_API_KEY": "benchmark",
+    "ANTHROPIC_API_KEY": "benchmark",
+    "AUTH_SUPERADMIN_EMAIL": "benchmark@example.com",
+    "AUTH_SUPERADMIN_PASSWORD": "benchmark",
+    "MONGODB_URL": "mongodb://127.0.0.1:1",
+    "MONGODB_DB_NAME": "benchmark",
+    "TRANSCRIBER_BACKEND": "openai",
+}
+
+LOOP_PROBE_INTERVAL_SEC = 0.01
+LOOP_BLOCK_THRESHOLD_SEC = 0.005
+
+
+class ScratchSampler:
+    """Samples sizes of scratch files from a thread, without touching the event loop"""
+
+    def __init__(self, directories: list[str], interval_sec: float = 0.02):
+        self._directories = directories
+        self._interval_sec = interval_sec
+        self._max_sizes: dict[str, int] = {}
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def written_bytes(self) -> int:
+        return sum(self._max_sizes.values())
+
+    def _sample(self):
+        total = 0
+        for directory in self._directories:
+            if not os.path.isdir(directory):
+                continue
+            for entry in os.scandir(directory):
+                try:
+                    size = entry.stat().st_size
+                except FileNotFoundError:
+                    continue
+                total += size
+                self._max_sizes[entry.path] = max(
+                    self._max_sizes.get(entry.path, 0), size
+                )
+        self.peak_bytes = max(self.peak_bytes, total)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self._interval_sec)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+async def probe_event_loop(stats: dict, stop: asyncio.Event):
+    """Measure how late the loop wakes up a sleeping task"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LOOP_PROBE_INTERVAL_SEC)
+        lag = time.perf_counter() - start - LOOP_PROBE_INTERVAL_SEC
+        if lag > LOOP_BLOCK_THRESHOLD_SEC:
+            stats["blocked_sec"] += lag
+            stats["max_block_sec"] = max(stats["max_block_sec"], lag)
+
+
+async def run_case(audio_path: str, stub: WhisperStubServer) -> dict:
+    # Imported after the environment points the OpenAI client at the stub
+    from src.common.settings import settings
+    from src.utils.audio_spool import audio_spool
+    from src.utils.utils import transcribe_audio_file
+
+    split_stats = {}
+
+    async def on_progress(stage: str, details: dict):
+        if "split_wall_time_sec" in details:
+            split_stats["split_sec"] = details["split_wall_time_sec"]
+            split_stats["chunks"] = details["chunks_total"]
+
+    sampler = ScratchSampler([settings.AUDIO_SPOOL_DIR, "temp"])
+    loop_stats = {"blocked_sec": 0.0, "max_block_sec": 0.0}
+    stop_probe = asyncio.Event()
+    probe_task = asyncio.create_task(probe_event_loop(loop_stats, stop_probe))
+    sampler.start()
+
+    start_time = time.perf_counter()
+    try:
+        # Same path as an upload: copied into the spool, then transcribed from there
+        file_ext = os.path.splitext(audio_path)[1]
+        with audio_spool.reserve(file_ext, os.path.getsize(audio_path)) as spooled_path:
+            await asyncio.to_thread(shutil.copyfile, audio_path, spooled_path)
+            transcription = await transcribe_audio_file(
+                spooled_path, on_progress=on_progress
+            )
+        total_sec = time.perf_counter() - start_time
+    finally:
+        stop_probe.set()
+        await probe_task
+        sampler.stop()
+
+    # ru_maxrss is in kilobytes on Linux
+    return {
+        "file": os.path.basename(audio_path),
+        "profile": settings.WHISPER_TRANSCODE_PROFILE,
+        "in_memory_chunks": settings.AUDIO_IN_MEMORY_CHUNKS,
+        "chunks": split_stats.get("chunks", 1),
+        "split_sec": split_stats.get("split_sec", 0.0),
+        "written_bytes": sampler.written_bytes,
+        "peak_scratch_bytes": sampler.peak_bytes,
+        "uploaded_bytes": stub.uploaded_bytes,
+        "requests": stub.requests,
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "ffmpeg_peak_rss_bytes": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        * 1024,
+        "blocked_sec": loop_stats["blocked_sec"],
+        "max_block_sec": loop_stats["max_block_sec"],
+        "total_sec": total_sec,
+        "partial": transcription.is_partial,
+    }
+
+
+def run_case_in_process(args: argparse.Namespace):
+    """Child process entry, prints the case result as JSON on the last line"""
+    stub = WhisperStubServer(args.latency_ms, args.latency_ms_per_mb)
+    stub.start()
+    os.environ["OPENAI_BASE_URL"] = stub.base_url
+    try:
+        result = asyncio.run(run_case(args.run_case, stub))
+    finally:
+        stub.stop()
+    print(json.dumps(result))
+
+
+def spawn_case(audio_path: str, args: argparse.Namespace) -> dict:
+    env = {**BENCHMARK_ENV, **os.environ}
+    env["WHISPER_TRANSCODE_PROFILE"] = args.profile or env.get(
+        "WHISPER_TRANSCODE_PROFILE", "opus_mono_16k"
+    )
+    if args.disk_chunks:
+        env["AUDIO_IN_MEMORY_CHUNKS"] = "false"
+    if args.trim_silences:
+        env["SILENCE_TRIM_ENABLED"] = "true"
+
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.audio_pipeline",
+            "--run-case",
+            audio_path,
+            "--latency-ms",
+            str(args.latency_ms),
+            "--latency-ms-per-mb",
+            str(args.latency_ms_per_mb),
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark of {audio_path} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", nargs="+", type=int, default=[1, 10, 60])
+    parser.add_argument("--latency-ms", type=float, default=500)
+    parser.add_argument("--latency-ms-per-mb", type=float, default=200)
+    parser.add_argument("--profile", help="WHISPER_TRANSCODE_PROFILE to benchmark")
+    parser.add_argument(
+        "--disk-chunks",
+        action="store_true",
+        help="Write chunks to temp/ instead of memory",
+    )
+    parser.add_argument(
+        "--trim-silences",
+        action="store_true",
+        help="Remove long silences before splitting",
+    )
+    parser.add_argument("--json", help="Also write results to this file")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        run_case_in_process(args)
+        return
+
+    print(
+        f"{'file':<24} {'chunks':>6} {'split_s':>8} {'written_mb':>10} {'uploaded_mb':>11} "
+        f"{'rss_mb':>7} {'ffmpeg_rss_mb':>13} {'blocked_ms':>10} {'max_block_ms':>12} {'total_s':>8}"
+    )
+    results = []
+    for minutes in args.minutes:
+        result = spawn_case(generate_recording(minutes), args)
+        results.append(result)
+        print(
+            f"{result['file']:<24} {result['chunks']:>6} {result['split_sec']:>8.2f} "
+            f"{result['written_bytes'] / 1024 / 1024:>10.2f} "
+            f"{result['uploaded_bytes'] / 1024 / 1024:>11.2f} "
+            f"{result['peak_rss_bytes'] / 1024 / 1024:>7.1f} "
+            f"{result['ffmpeg_peak_rss_bytes'] / 1024 / 1024:>13.1f} "
+            f"{result['blocked_sec'] * 1000:>10.1f} {result['max_block_sec'] * 1000:>12.1f} "
+            f"{result['total_sec']:>8.2f}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Synthetic recordings for offline audio pipeline benchmarks.
+
+Tone bursts stand in for speech: 5.5s of sound followed by 1.5s pauses, so
+chunks can be cut at silences, and a 10s pause every 5 minutes that the
+silence trimmer removes. Encoded like phone recordings (AAC 44.1 kHz stereo).
+"""
+
+import os
+import subprocess
+import tempfile
+
+RECORDINGS_DIR = os.path.join(tempfile.gettempdir(), "yourscribe-benchmarks")
+
+# Speech-like amplitude well above SILENCE_NOISE_DB, pauses carry faint noise below it
+SPEECH_EXPR = (
+    "(0.4*sin(2*PI*220*t)+0.2*sin(2*PI*660*t))"
+    "*gt(mod(t,7),1.5)*lt(mod(t,300),290)"
+    "+0.003*(random(0)-0.5)"
+)
+
+
+def generate_recording(minutes: int, ext: str = "m4a") -> str:
+    """Generate recording once and return its path, later calls reuse the file"""
+    os.makedirs(RECORDINGS_DIR, exist_ok=True)
+    path = os.path.join(RECORDINGS_DIR, f"synthetic_{minutes}min.{ext}")
+    if os.path.exists(path):
+        return path
+
+    codec_args = (
+        ["-c:a", "aac", "-b:a", "128k"]
+        if ext == "m4a"
+        else ["-c:a", "libmp3lame", "-b:a", "128k"]
+    )
+    tmp_path = f"{path}.part.{ext}"
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"aevalsrc='{SPEECH_EXPR}':s=44100:d={minutes * 60}",
+            "-ac",
+            "2",
+            *codec_args,
+            tmp_path,
+        ],
+        check=True,
+    )
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,83 @@
+"""Compare Whisper transcoding profiles on real recordings.
+
+Reports bytes uploaded and end-to-end transcription time per profile:
+
+    python -m benchmarks.transcode_profiles recording.m4a [--profiles copy opus_mono_16k]
+
+Set OPENAI_BASE_URL to point the OpenAI client at a local stub, or
+TRANSCRIBER_BACKEND=local to transcribe offline with faster-whisper.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from src.utils.audio_profiles import TRANSCODE_PROFILES, get_transcode_profile
+from src.utils.utils import (
+    cleanup_audio_chunks,
+    split_audio_into_chunks,
+    transcribe_audio_chunk,
+    transcribe_with_file,
+)
+
+
+async def benchmark_profile(audio_path: str, profile_name: str) -> dict:
+    profile = get_transcode_profile(profile_name)
+
+    start_time = time.perf_counter()
+    chunks = await split_audio_into_chunks(audio_path, profile=profile)
+    split_sec = time.perf_counter() - start_time
+
+    try:
+        if chunks:
+            bytes_sent = sum(
+                (
+                    len(chunk.data)
+                    if chunk.data is not None
+                    else os.path.getsize(chunk.path)
+                )
+                for chunk in chunks
+            )
+            await asyncio.gather(*[transcribe_audio_chunk(chunk) for chunk in chunks])
+        else:
+            bytes_sent = os.path.getsize(audio_path)
+            await transcribe_with_file(audio_path)
+    finally:
+        cleanup_audio_chunks(chunks)
+
+    return {
+        "profile": profile_name,
+        "chunks": len(chunks) or 1,
+        "bytes_sent": bytes_sent,
+        "split_sec": split_sec,
+        "total_sec": time.perf_counter() - start_time,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("audio_paths", nargs="+")
+    parser.add_argument(
+        "--profiles",
+        nargs="+",
+        default=list(TRANSCODE_PROFILES),
+        choices=TRANSCODE_PROFILES,
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'file':<30} {'profile':<18} {'chunks':>6} {'MB sent':>9} {'split s':>8} {'total s':>8}"
+    )
+    for audio_path in args.audio_paths:
+        for profile_name in args.profiles:
+            result = await benchmark_profile(audio_path, profile_name)
+            print(
+                f"{os.path.basename(audio_path):<30} {result['profile']:<18} "
+                f"{result['chunks']:>6} {result['bytes_sent'] / 1024 / 1024:>9.2f} "
+                f"{result['split_sec']:>8.2f} {result['total_sec']:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
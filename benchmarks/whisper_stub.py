@@ -0,0 +1,68 @@
+"""Local stand-in for the OpenAI transcription endpoint.
+
+Answers POST /v1/audio/transcriptions after base latency plus latency per
+uploaded MB, and counts requests and uploaded bytes. Point the OpenAI client
+at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_TRANSCRIPT = "The patient was seen today for a follow-up appointment."
+
+
+class WhisperStubServer:
+    def __init__(self, latency_ms: float = 500, latency_ms_per_mb: float = 200):
+        self.latency_ms = latency_ms
+        self.latency_ms_per_mb = latency_ms_per_mb
+        self.requests = 0
+        self.uploaded_bytes = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._build_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1"
+
+    def _build_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if not self.path.endswith("/audio/transcriptions"):
+                    self.send_error(404)
+                    return
+
+                body_size = int(self.headers.get("Content-Length", 0))
+                self.rfile.read(body_size)
+                with stub._lock:
+                    stub.requests += 1
+                    stub.uploaded_bytes += body_size
+
+                time.sleep(
+                    (stub.latency_ms + stub.latency_ms_per_mb * body_size / 1024 / 1024)
+                    / 1000
+                )
+                response = STUB_TRANSCRIPT.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Content-Length", str(len(response)))
+                self.end_headers()
+                self.wfile.write(response)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
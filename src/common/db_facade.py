@@ -106,6 +106,10 @@ class DatabaseFacade:
         else:
             return await self.model_class.count()
 
+    async def aggregate(self, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run aggregation pipeline over the collection"""
+        return await self.model_class.aggregate(pipeline).to_list()
+
     async def exists(self, **filters) -> bool:
         """Check if document exists"""
         return await self.get_one(**filters) is not None
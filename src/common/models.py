@@ -1,9 +1,11 @@
 from datetime import datetime, timezone
-from typing import Optional
+from typing import List, Optional
 from beanie import Document, Indexed
 from pydantic import Field
 from pymongo import IndexModel
 
+from src.common.settings import settings
+
 
 class User(Document):
     email: Indexed(str, unique=True)
@@ -45,6 +47,12 @@ class TranscriptionProcessingResult(Document):
         ..., description="Input text or transcription that was processed"
     )
     processing_result: dict = Field(..., description="JSON result from LLM processing")
+    usage: Optional[dict] = Field(
+        default=None, description="Token usage and stage timings for this result"
+    )
+    job_id: Optional[str] = Field(
+        default=None, description="AudioProcessingJob that produced this result"
+    )
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
     class Settings:
@@ -53,6 +61,101 @@ class TranscriptionProcessingResult(Document):
             IndexModel([("user_id", 1)]),
             IndexModel([("created_at", -1)]),
             IndexModel([("user_id", 1), ("created_at", -1)]),
+            # One result per audio job, a retried job can't insert a second one
+            IndexModel(
+                [("job_id", 1)],
+                unique=True,
+                partialFilterExpression={"job_id": {"$type": "string"}},
+            ),
+        ]
+
+
+class AudioProcessingJob(Document):
+    user_id: str = Field(..., description="Reference to User")
+    filename: str = Field(..., description="Original uploaded filename")
+    processing_type: str = Field(default="transcription")
+    audio_path: str = Field(..., description="Path to the stored upload")
+    status: str = Field(default="queued", description="queued, running, completed, failed")
+    stage: Optional[str] = Field(
+        default=None, description="split, transcribe, stage_one, stage_two"
+    )
+    progress: dict = Field(default_factory=dict)
+    transcribed_text: Optional[str] = Field(default=None)
+    result: Optional[dict] = Field(default=None)
+    error: Optional[str] = Field(default=None)
+    attempts: int = Field(default=0)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "audio_processing_jobs"
+        indexes = [
+            IndexModel([("user_id", 1), ("created_at", -1)]),
+            IndexModel([("status", 1), ("created_at", 1)]),
+        ]
+
+
+class AudioUploadSession(Document):
+    user_id: str = Field(..., description="Reference to User")
+    filename: str = Field(..., description="Original recording filename")
+    processing_type: str = Field(default="transcription")
+    total_size: int = Field(..., description="Declared size of the whole recording in bytes")
+    audio_path: str = Field(..., description="Path of the file parts are appended to")
+    received_bytes: int = Field(default=0, description="Bytes of committed parts")
+    part_checksums: List[str] = Field(
+        default_factory=list, description="sha256 of committed parts, in part order"
+    )
+    status: str = Field(default="uploading", description="uploading, finalized")
+    job_id: Optional[str] = Field(default=None, description="AudioProcessingJob created on finalize")
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "audio_upload_sessions"
+        indexes = [
+            IndexModel([("user_id", 1)]),
+            # Abandoned sessions expire, their files are removed periodically
+            IndexModel(
+                [("updated_at", 1)],
+                expireAfterSeconds=settings.UPLOAD_SESSION_TTL_SECONDS,
+            ),
+        ]
+
+
+class LlmResultCache(Document):
+    cache_key: str = Field(..., description="Hash of normalized text, prompt version and additional prompt")
+    user_id: str = Field(..., description="Reference to User")
+    processing_result: dict = Field(..., description="Cached LlmStageOutput")
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "llm_result_cache"
+        indexes = [
+            IndexModel([("cache_key", 1)], unique=True),
+            IndexModel([("user_id", 1)]),
+            IndexModel(
+                [("created_at", 1)],
+                expireAfterSeconds=settings.RESULT_CACHE_TTL_SECONDS,
+            ),
+        ]
+
+
+class TranscriptionCache(Document):
+    cache_key: str = Field(..., description="Hash of user, transcription settings and audio content")
+    user_id: str = Field(..., description="Reference to User")
+    scope: str = Field(..., description="Whole recording ('audio') or single transcoded chunk ('chunk')")
+    transcript: str = Field(..., description="Cached Whisper transcript")
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "transcription_cache"
+        indexes = [
+            IndexModel([("cache_key", 1)], unique=True),
+            IndexModel([("user_id", 1)]),
+            IndexModel(
+                [("created_at", 1)],
+                expireAfterSeconds=settings.TRANSCRIPT_CACHE_TTL_SECONDS,
+            ),
         ]
 
 
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
@@ -11,6 +13,154 @@ class Settings(BaseSettings):
         ...,
         description="Anthropic API Key",
     )
+    ANTHROPIC_API_URL: Optional[str] = Field(
+        default=None,
+        description="Override Anthropic API base URL, e.g. a local stub for benchmarks",
+    )
+    ANTHROPIC_PROMPT_CACHING: bool = Field(
+        default=True,
+        description="Mark stable system prompt prefixes as cacheable for Anthropic",
+    )
+    LLM_MAX_CONCURRENCY: int = Field(
+        default=8,
+        description="Max concurrent LLM calls across all users",
+    )
+    LLM_TOKENS_PER_MINUTE: int = Field(
+        default=400_000,
+        description="Estimated LLM input tokens admitted per minute, 0 disables the budget",
+    )
+    AUDIO_TRANSCRIPTION_CONCURRENCY: int = Field(
+        default=4,
+        description="Max audio files transcribed at the same time across all requests",
+    )
+    TRANSCRIBER_BACKEND: str = Field(
+        default="openai",
+        description="Speech-to-text backend: 'openai' (Whisper API) or 'local' (faster-whisper on CPU)",
+    )
+    LOCAL_WHISPER_MODEL: str = Field(
+        default="small",
+        description="faster-whisper model size or path for the local backend",
+    )
+    LOCAL_WHISPER_WORKERS: int = Field(
+        default=2,
+        description="Worker processes of the local backend, each holds its own model copy",
+    )
+    LOCAL_WHISPER_COMPUTE_TYPE: str = Field(
+        default="int8",
+        description="Quantization of the local model, e.g. int8, int8_float32, float32",
+    )
+    LOCAL_WHISPER_CPU_THREADS: int = Field(
+        default=2,
+        description="CPU threads per local worker process",
+    )
+    LOCAL_WHISPER_BEAM_SIZE: int = Field(
+        default=1,
+        description="Beam size of the local backend, 1 is greedy decoding and fastest",
+    )
+    TRANSCRIPTION_MAX_ATTEMPTS: int = Field(
+        default=4,
+        description="Attempts per audio chunk before it is left as a gap in the transcript",
+    )
+    TRANSCRIPTION_RETRY_BACKOFF_SEC: float = Field(
+        default=1.0,
+        description="Delay before the first chunk retry, doubled on every further attempt",
+    )
+    WHISPER_TRANSCODE_PROFILE: str = Field(
+        default="opus_mono_16k",
+        description="Transcoding profile for audio chunks sent to Whisper, see src/utils/audio_profiles.py",
+    )
+    WHISPER_CHUNK_TARGET_SEC: int = Field(
+        default=120,
+        description="Target audio chunk length, chunks are cut at the nearest silence",
+    )
+    WHISPER_CHUNK_OVERLAP_SEC: float = Field(
+        default=2.0,
+        description="Overlap added when no silence is found near the target cut",
+    )
+    SILENCE_NOISE_DB: int = Field(
+        default=-35,
+        description="Volume below which audio counts as silence for chunk boundaries",
+    )
+    SILENCE_MIN_DURATION_SEC: float = Field(
+        default=0.5,
+        description="Minimum silence length usable as a chunk boundary",
+    )
+    SILENCE_TRIM_ENABLED: bool = Field(
+        default=False,
+        description="Remove long silences from audio before transcription, opt-in as it shifts transcript timing",
+    )
+    SILENCE_TRIM_MIN_SEC: float = Field(
+        default=3.0,
+        description="Only silences at least this long are removed",
+    )
+    SILENCE_TRIM_PADDING_SEC: float = Field(
+        default=0.5,
+        description="Silence kept on each side of a removed span",
+    )
+    AUDIO_SPLIT_CONCURRENCY: int = Field(
+        default=4,
+        description="Max ffmpeg processes extracting chunks of one file at the same time",
+    )
+    AUDIO_IN_MEMORY_CHUNKS: bool = Field(
+        default=True,
+        description="Read chunks from ffmpeg stdout and upload them from memory instead of temp files",
+    )
+    AUDIO_SPOOL_DIR: str = Field(
+        default="/dev/shm/yourscribe",
+        description="tmpfs directory for uploads and intermediate audio ffmpeg has to seek in",
+    )
+    AUDIO_SPOOL_MAX_MB: int = Field(
+        default=48,
+        description="Max total size of spooled audio, larger files fall back to temp/ on disk",
+    )
+    AUDIO_REQUEST_SPOOL_MAX_MB: int = Field(
+        default=24,
+        description="Max size of one request's uploads kept in the tmpfs spool, the rest goes to disk",
+    )
+    AUDIO_UPLOAD_BLOCK_KB: int = Field(
+        default=1024,
+        description="Block size for copying uploaded audio, bounds memory used per upload",
+    )
+    WEBSOCKET_ALLOWED_ORIGINS: str = Field(
+        default="",
+        description="Comma-separated origins allowed to open WebSockets besides the app's own host, e.g. https://drlal.com.au",
+    )
+    LIVE_DICTATION_SEGMENT_SEC: float = Field(
+        default=15,
+        description="Minimum new audio before a live dictation segment is cut at a silence",
+    )
+    LIVE_DICTATION_MAX_SEGMENT_SEC: float = Field(
+        default=30,
+        description="Live dictation segment is cut hard when no silence is found by then",
+    )
+    LIVE_DICTATION_MAX_MB: int = Field(
+        default=100,
+        description="Max size of audio received over one live dictation connection",
+    )
+    UPLOAD_PART_MAX_MB: int = Field(
+        default=16,
+        description="Max size of one part of a resumable upload",
+    )
+    UPLOAD_MAX_MB: int = Field(
+        default=1024,
+        description="Max size of a recording uploaded with the resumable upload protocol",
+    )
+    UPLOAD_SESSION_TTL_SECONDS: int = Field(
+        default=60 * 60 * 24,
+        description="Seconds an unfinished resumable upload can be resumed after its last part",
+    )
+    UPLOAD_CLEANUP_INTERVAL_SECONDS: int = Field(
+        default=60 * 60,
+        description="Seconds between removals of files left by expired resumable uploads",
+    )
+    AUDIO_JOB_WORKERS: int = Field(
+        default=2,
+        description="Number of in-process workers for background audio jobs",
+    )
+    AUDIO_JOB_MAX_ATTEMPTS: int = Field(
+        default=3,
+        description="Attempts before a background audio job is marked failed",
+    )
     IS_DEBUG: bool = Field(
         default=False,
         description="Debug mode flag",
@@ -31,6 +181,43 @@ class Settings(BaseSettings):
         ...,
         description="MongoDB database name",
     )
+    PROMPT_CACHE_MAX_USERS: int = Field(
+        default=256,
+        description="Max number of users whose compiled prompts are kept in memory",
+    )
+    PROMPT_CACHE_TTL_SECONDS: int = Field(
+        default=300,
+        description="Seconds before cached prompts are revalidated against MongoDB",
+    )
+    RESULT_CACHE_TTL_SECONDS: int = Field(
+        default=60 * 60 * 24,
+        description="Seconds a memoized LLM processing result is kept in MongoDB",
+    )
+    TRANSCRIPT_CACHE_TTL_SECONDS: int = Field(
+        default=60 * 60 * 24,
+        description="Seconds a transcript cached by audio content hash is kept in MongoDB",
+    )
+
+    DOCX_TEMPLATE_CACHE_SIZE: int = Field(
+        default=32,
+        description="Max number of parsed DOCX report templates kept in memory per render worker",
+    )
+    DOCX_RENDER_WORKERS: int = Field(
+        default=2,
+        description="Number of worker processes rendering DOCX reports",
+    )
+    DOCX_RENDER_TIMEOUT_SEC: float = Field(
+        default=30.0,
+        description="Seconds a single DOCX render may take before the request fails",
+    )
+    DOCX_HTML_RUNS_CACHE_SIZE: int = Field(
+        default=1024,
+        description="Max number of HTML values kept converted to DOCX runs per render worker",
+    )
+    DOCX_BATCH_MAX_ITEMS: int = Field(
+        default=50,
+        description="Max number of reports in one batch DOCX export",
+    )
 
     class Config:
         env_file = ".env"
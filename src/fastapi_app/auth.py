@@ -3,9 +3,11 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Form, Request, Cookie
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.responses import JSONResponse, RedirectResponse
+from starlette.requests import HTTPConnection
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 import os
+from urllib.parse import urlsplit
 
 from src.common.models import User, ReportData, AllowedEmails
 from src.common.db_facade import DatabaseFacade
@@ -66,6 +68,30 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 
 async def get_current_user(request: Request) -> User:
     """Get current user from JWT token (from cookie or Authorization header)"""
+    return await get_user_from_connection(request)
+
+
+def is_allowed_origin(connection: HTTPConnection) -> bool:
+    """Check Origin of a WebSocket handshake, browsers send cookies cross-site too"""
+    origin = connection.headers.get("origin")
+    if not origin:
+        return False
+
+    origin = origin.rstrip("/").lower()
+    allowed_origins = {
+        allowed.strip().rstrip("/").lower()
+        for allowed in settings.WEBSOCKET_ALLOWED_ORIGINS.split(",")
+        if allowed.strip()
+    }
+    if origin in allowed_origins:
+        return True
+
+    # Same origin, the page was served by the host the socket connects to
+    return urlsplit(origin).netloc == connection.headers.get("host", "").lower()
+
+
+async def get_user_from_connection(request: HTTPConnection) -> User:
+    """Get user from JWT token of HTTP request or WebSocket handshake"""
     token = None
 
     # Try to get token from cookie first
@@ -0,0 +1,105 @@
+import asyncio
+
+from src.common.settings import settings
+from src.utils.audio_chunking import choose_live_cut, stitch_overlap
+from src.utils.utils import (
+    PCM_BYTES_PER_SEC,
+    decode_pcm_with_silences,
+    pcm_to_wav,
+    retry_transcription,
+    transcribe_with_buffer,
+    write_audio_file,
+)
+
+# Shorter leftovers are mostly noise and make Whisper hallucinate
+MIN_SEGMENT_SEC = 0.5
+
+
+class LiveDictationSession:
+    """Rolling transcription of a recording that is still being received.
+
+    The browser sends MediaRecorder timeslices of one continuous stream where
+    only the first carries the container header, so they are appended to one
+    file and the audio after the last transcribed position is decoded again on
+    every step. Segments are cut at silences and transcribed one at a time.
+    """
+
+    def __init__(self, audio_path: str):
+        self.audio_path = audio_path
+        self.received_bytes = 0
+        self.transcribed_sec = 0.0
+        self.segments: list[str] = []
+        self._overlap_sec = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(segment for segment in self.segments if segment)
+
+    async def append(self, data: bytes):
+        if (
+            self.received_bytes + len(data)
+            > settings.LIVE_DICTATION_MAX_MB * 1024 * 1024
+        ):
+            raise ValueError("Recording is too large")
+        await asyncio.to_thread(write_audio_file, self.audio_path, data, True)
+        self.received_bytes += len(data)
+
+    async def transcribe_next_segment(self, final: bool = False) -> bool:
+        """Transcribe the next segment if enough audio arrived, or the rest when final.
+
+        Returns True when the transcript changed.
+        """
+        async with self._lock:
+            start_sec = max(self.transcribed_sec - self._overlap_sec, 0.0)
+            try:
+                pcm, silences = await decode_pcm_with_silences(
+                    self.audio_path, start_sec
+                )
+            except RuntimeError:
+                if final:
+                    raise
+                # Last timeslice may end mid-frame, retry when more audio arrives
+                return False
+
+            available_sec = len(pcm) / PCM_BYTES_PER_SEC
+            overlap_sec = self.transcribed_sec - start_sec
+            if final:
+                cut_sec = available_sec
+            else:
+                cut_sec = choose_live_cut(
+                    available_sec,
+                    silences,
+                    min_sec=overlap_sec + settings.LIVE_DICTATION_SEGMENT_SEC,
+                    max_sec=overlap_sec + settings.LIVE_DICTATION_MAX_SEGMENT_SEC,
+                )
+                if cut_sec is None:
+                    return False
+
+            if cut_sec - overlap_sec < MIN_SEGMENT_SEC:
+                self.transcribed_sec = start_sec + cut_sec
+                return False
+
+            segment_wav = pcm_to_wav(pcm[: int(cut_sec * PCM_BYTES_PER_SEC) // 2 * 2])
+            text = await retry_transcription(
+                lambda: transcribe_with_buffer(segment_wav, "segment.wav"),
+                f"live segment {len(self.segments) + 1}",
+            )
+            text = text.strip()
+            if self.segments and overlap_sec > 0:
+                text = stitch_overlap(self.segments[-1], text)
+            self.segments.append(text)
+
+            self.transcribed_sec = start_sec + cut_sec
+            # Hard cuts may split a word, so the next segment starts a bit earlier
+            hard_cut = not final and not any(
+                silence_start <= cut_sec <= silence_end
+                for silence_start, silence_end in silences
+            )
+            self._overlap_sec = settings.WHISPER_CHUNK_OVERLAP_SEC if hard_cut else 0.0
+            return True
+
+    async def finish(self) -> str:
+        """Transcribe remaining audio and return the full transcript"""
+        await self.transcribe_next_segment(final=True)
+        return self.transcript
@@ -0,0 +1,224 @@
+import asyncio
+import os
+import uuid
+from datetime import datetime, timezone
+
+from fastapi import UploadFile
+
+from src.common.settings import settings
+from src.common.models import AudioProcessingJob, TranscriptionProcessingResult
+from src.common.db_facade import DatabaseFacade
+from src.fastapi_app.services import (
+    get_additional_prompt,
+    process_and_save_text,
+    transcribe_single_audio,
+)
+from src.fastapi_app.uploads import cleanup_stale_upload_files, copy_upload_to_file
+from src.utils.consts import AUDIO_JOBS_FILES_DIR
+from src.utils.utils import cleanup_temp_file
+
+
+class AudioJobWorkerPool:
+    """In-process worker pool for audio jobs persisted in MongoDB.
+
+    Jobs left queued or running by a previous process are picked up again on start.
+    A job whose transcription already finished resumes from the LLM stages.
+    Files left by expired resumable uploads are removed every cleanup_interval_sec.
+    """
+
+    def __init__(self, workers: int, max_attempts: int, cleanup_interval_sec: int):
+        self._workers_count = workers
+        self._max_attempts = max_attempts
+        self._cleanup_interval_sec = cleanup_interval_sec
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+        # Serializes updates of a running job, progress of parallel chunks included
+        self._job_locks: dict[str, asyncio.Lock] = {}
+
+    async def start(self):
+        """Recover unfinished jobs and start workers"""
+        os.makedirs(AUDIO_JOBS_FILES_DIR, exist_ok=True)
+
+        job_facade = DatabaseFacade(AudioProcessingJob)
+        unfinished_jobs = await job_facade.get_many(
+            filters={"status": {"$in": ["queued", "running"]}},
+            sort=[("created_at", 1)],
+        )
+        for job in unfinished_jobs:
+            self._queue.put_nowait(str(job.id))
+        if unfinished_jobs:
+            print(f"Recovered {len(unfinished_jobs)} unfinished audio jobs")
+
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self._workers_count)
+        ]
+        self._workers.append(asyncio.create_task(self._cleanup_uploads()))
+
+    async def stop(self):
+        """Stop workers, running jobs stay 'running' and are resumed on next start"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(
+        self, user_id: str, file: UploadFile, processing_type: str
+    ) -> AudioProcessingJob:
+        """Store upload on disk, persist job and queue it for processing"""
+        audio_path = self._new_audio_path(file.filename)
+        await copy_upload_to_file(file, audio_path)
+        return await self._create_job(
+            user_id, file.filename, processing_type, audio_path
+        )
+
+    async def submit_file(
+        self, user_id: str, filename: str, processing_type: str, source_path: str
+    ) -> AudioProcessingJob:
+        """Move already stored recording to the jobs directory and queue it"""
+        audio_path = self._new_audio_path(filename)
+        await asyncio.to_thread(os.replace, source_path, audio_path)
+        return await self._create_job(user_id, filename, processing_type, audio_path)
+
+    @staticmethod
+    def _new_audio_path(filename: str) -> str:
+        file_ext = os.path.splitext(filename)[1] or ".mp3"
+        return os.path.join(AUDIO_JOBS_FILES_DIR, f"{uuid.uuid4().hex}{file_ext}")
+
+    async def _create_job(
+        self, user_id: str, filename: str, processing_type: str, audio_path: str
+    ) -> AudioProcessingJob:
+        job_facade = DatabaseFacade(AudioProcessingJob)
+        job = await job_facade.create(
+            user_id=user_id,
+            filename=filename,
+            processing_type=processing_type,
+            audio_path=audio_path,
+        )
+        self._queue.put_nowait(str(job.id))
+        return job
+
+    @staticmethod
+    def _cleanup_audio(job: AudioProcessingJob):
+        if os.path.exists(job.audio_path):
+            cleanup_temp_file(job.audio_path)
+
+    async def _update_job(self, job: AudioProcessingJob, **updates):
+        """Write only the given fields, in call order.
+
+        Chunks report progress concurrently, a full save of a stale copy of the
+        job could otherwise overwrite a newer status or progress.
+        """
+        updates["updated_at"] = datetime.now(timezone.utc)
+        async with self._job_locks.setdefault(str(job.id), asyncio.Lock()):
+            await job.set(updates)
+
+    @staticmethod
+    async def _get_saved_result(job: AudioProcessingJob) -> dict | None:
+        """Result saved by an earlier attempt that failed before completing the job"""
+        result_facade = DatabaseFacade(TranscriptionProcessingResult)
+        saved = await result_facade.get_one(job_id=str(job.id))
+        if not saved:
+            return None
+        return {**saved.processing_result, "source_filename": job.filename}
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error running audio job {job_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _cleanup_uploads(self):
+        while True:
+            try:
+                await cleanup_stale_upload_files()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error cleaning up resumable upload files: {str(e)}")
+            await asyncio.sleep(self._cleanup_interval_sec)
+
+    async def _run_job(self, job_id: str):
+        try:
+            await self._process_job(job_id)
+        finally:
+            self._job_locks.pop(job_id, None)
+
+    async def _process_job(self, job_id: str):
+        job_facade = DatabaseFacade(AudioProcessingJob)
+        job = await job_facade.get_by_id(job_id)
+        if not job or job.status in ("completed", "failed"):
+            return
+
+        await self._update_job(
+            job, status="running", attempts=job.attempts + 1, error=None
+        )
+
+        async def on_progress(stage: str, details: dict):
+            await self._update_job(job, stage=stage, progress=details)
+
+        try:
+            saved_result = await self._get_saved_result(job)
+            if saved_result is not None:
+                await self._update_job(
+                    job, status="completed", stage=None, result=saved_result
+                )
+                self._cleanup_audio(job)
+                return
+
+            timings = {}
+            if job.transcribed_text is None:
+                transcribed_text = await transcribe_single_audio(
+                    job.audio_path,
+                    job.user_id,
+                    on_progress=on_progress,
+                    timings=timings,
+                )
+                await self._update_job(job, transcribed_text=transcribed_text)
+
+            source_type = (
+                "audio_dictation" if job.processing_type == "dictation" else "audio"
+            )
+            result = await process_and_save_text(
+                job.transcribed_text,
+                job.user_id,
+                source_type=source_type,
+                filename=job.filename,
+                additional_prompt=get_additional_prompt(job.processing_type),
+                on_progress=on_progress,
+                transcription_wall_time_sec=timings.get("transcription_wall_time_sec"),
+                transcription_wait_sec=timings.get("transcription_wait_sec"),
+                job_id=str(job.id),
+            )
+            await self._update_job(job, status="completed", stage=None, result=result)
+            self._cleanup_audio(job)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error in audio job {job_id} (attempt {job.attempts}): {str(e)}")
+            audio_missing = job.transcribed_text is None and not os.path.exists(
+                job.audio_path
+            )
+            if job.attempts >= self._max_attempts or audio_missing:
+                await self._update_job(job, status="failed", error=str(e))
+                self._cleanup_audio(job)
+            else:
+                await self._update_job(job, status="queued", error=str(e))
+                # Back off before retrying, 10s, 20s, 40s...
+                delay = 10 * 2 ** (job.attempts - 1)
+                asyncio.get_running_loop().call_later(
+                    delay, self._queue.put_nowait, job_id
+                )
+
+
+audio_job_pool = AudioJobWorkerPool(
+    workers=settings.AUDIO_JOB_WORKERS,
+    max_attempts=settings.AUDIO_JOB_MAX_ATTEMPTS,
+    cleanup_interval_sec=settings.UPLOAD_CLEANUP_INTERVAL_SECONDS,
+)
@@ -14,6 +14,7 @@ from passlib.context import CryptContext
 from fastapi.templating import Jinja2Templates
 
 from src.fastapi_app.routes import router as main_router
+from src.fastapi_app.jobs import audio_job_pool
 from src.fastapi_app.auth import (
     router as auth_router,
     get_current_user,
@@ -21,9 +22,20 @@ from src.fastapi_app.auth import (
 )
 from src.utils.consts import USER_REPORTS_FILES_DIR
 from src.common.settings import settings
-from src.common.models import User, ReportData, TranscriptionProcessingResult, AllowedEmails
+from src.common.models import (
+    User,
+    ReportData,
+    TranscriptionProcessingResult,
+    AudioProcessingJob,
+    AudioUploadSession,
+    LlmResultCache,
+    TranscriptionCache,
+    AllowedEmails,
+)
 from src.common.db_facade import DatabaseFacade
 from src.utils.utils import load_default_prompt_files_data
+from src.utils.transcribers import shutdown_transcribers
+from src.utils.docx_renderer import docx_render_pool
 
 from passlib.context import CryptContext
 
@@ -45,7 +57,16 @@ async def lifespan(app: FastAPI):
     client = AsyncIOMotorClient(settings.MONGODB_URL)
     await init_beanie(
         database=client[settings.MONGODB_DB_NAME],
-        document_models=[User, ReportData, TranscriptionProcessingResult, AllowedEmails],
+        document_models=[
+            User,
+            ReportData,
+            TranscriptionProcessingResult,
+            AudioProcessingJob,
+            AudioUploadSession,
+            LlmResultCache,
+            TranscriptionCache,
+            AllowedEmails,
+        ],
     )
 
     # Create superadmin user if not exists
@@ -79,9 +100,16 @@ async def lifespan(app: FastAPI):
     else:
         print(f"Superadmin user already exists: {settings.AUTH_SUPERADMIN_EMAIL}")
 
+    # Start background audio workers, resuming jobs from previous run,
+    # and periodic removal of files left by expired resumable uploads
+    await audio_job_pool.start()
+
     yield
 
     print("Server is shutting down...")
+    await audio_job_pool.stop()
+    shutdown_transcribers()
+    docx_render_pool.shutdown()
     client.close()
 
 
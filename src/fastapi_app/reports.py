@@ -0,0 +1,142 @@
+import asyncio
+import os
+import re
+from urllib.parse import quote
+
+from src.utils.conversion_utils import ConversionUtils
+from src.utils.docx_renderer import docx_render_pool
+from src.utils.schemas import FileData, LlmStageOutput
+from src.utils.utils import load_prompt_files
+
+DOCX_MEDIA_TYPE = (
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+)
+DEFAULT_REPORT_TEMPLATE_PATH = "files/default_docx_report.docx"
+DEFAULT_REPORT_FILENAME = "medical_report.docx"
+DEFAULT_REPORTS_ARCHIVE_FILENAME = "medical_reports.zip"
+
+
+async def get_report_template_path(user_id: str) -> str:
+    """Return path of user's DOCX template, or of the default one"""
+    try:
+        user_prompts = await load_prompt_files(user_id)
+        template_path = user_prompts.get(
+            "report_file_url", DEFAULT_REPORT_TEMPLATE_PATH
+        )
+
+        # Handle user-specific files path
+        if template_path and not template_path.startswith("files/"):
+            template_path = os.path.join("files/user_reports", template_path)
+    except Exception:
+        # Fallback to default
+        template_path = DEFAULT_REPORT_TEMPLATE_PATH
+    return template_path
+
+
+def build_report_filename(patient_name: str | None, data_dict: dict) -> str:
+    """Build DOCX filename from patient name or first line of recipients_info"""
+    final_patient_name = patient_name
+    if not final_patient_name:
+        # Fallback to extracting from recipients_info
+        recipients_info = (data_dict.get("recipients_info") or "").strip()
+        if recipients_info:
+            # Remove HTML tags and take first line only
+            text_only = re.sub(r"<[^>]+>", "", recipients_info)
+            first_line = text_only.split("\n")[0]
+            final_patient_name = first_line.strip() if first_line else None
+
+    if not final_patient_name:
+        return DEFAULT_REPORT_FILENAME
+
+    # Remove "Patient Name:" prefix if present
+    cleaned_name = re.sub(
+        r"^Patient Name:\s*", "", final_patient_name, flags=re.IGNORECASE
+    )
+
+    # Clean patient name for safe filename - preserve hashtags, allow spaces
+    # Remove only characters that are truly unsafe for filenames
+    safe_name = re.sub(r'[<>:"/\\|?*]', "", cleaned_name).strip()
+
+    # Only use the patient name if it's not empty after cleaning
+    return safe_name + ".docx" if safe_name else DEFAULT_REPORT_FILENAME
+
+
+def content_disposition(
+    filename: str, fallback_filename: str = DEFAULT_REPORT_FILENAME
+) -> str:
+    """Attachment header, with an RFC 5987 UTF-8 name for non-ASCII patient names"""
+    ascii_filename = filename.encode("ascii", "ignore").decode("ascii").strip()
+    if not ascii_filename or ascii_filename.startswith("."):
+        ascii_filename = fallback_filename
+    return (
+        f'attachment; filename="{ascii_filename}"; '
+        f"filename*=UTF-8''{quote(filename, safe='')}"
+    )
+
+
+async def get_existing_report_template_path(user_id: str) -> str:
+    """Same as get_report_template_path, raises FileNotFoundError when it's missing"""
+    template_path = await get_report_template_path(user_id)
+    if not os.path.exists(template_path):
+        raise FileNotFoundError(f"DOCX template not found: {template_path}")
+    return template_path
+
+
+async def render_docx_with_template(
+    template_path: str, data: LlmStageOutput, patient_name: str | None = None
+) -> tuple[bytes, str]:
+    data_dict = data.model_dump()
+    docx_content = await docx_render_pool.render(template_path, data_dict)
+    return docx_content, build_report_filename(patient_name, data_dict)
+
+
+async def render_report_docx(
+    user_id: str, data: LlmStageOutput, patient_name: str | None = None
+) -> tuple[bytes, str]:
+    """Fill user's DOCX template with data and return file content and filename.
+
+    Rendering runs in the DOCX worker pool. Raises FileNotFoundError when the
+    template is missing and TimeoutError when rendering takes too long.
+    """
+    template_path = await get_existing_report_template_path(user_id)
+    return await render_docx_with_template(template_path, data, patient_name)
+
+
+def unique_filename(filename: str, used_filenames: set[str]) -> str:
+    """Number repeated filenames like 'Name (2).docx', archive entries must differ"""
+    name, ext = os.path.splitext(filename)
+    candidate = filename
+    counter = 2
+    while candidate.lower() in used_filenames:
+        candidate = f"{name} ({counter}){ext}"
+        counter += 1
+    used_filenames.add(candidate.lower())
+    return candidate
+
+
+async def render_reports_zip(
+    user_id: str, reports: list[tuple[LlmStageOutput, str | None]]
+) -> bytes:
+    """Render (data, patient_name) reports concurrently and pack them into a ZIP.
+
+    The template is looked up once for the whole batch, the render pool spreads
+    the documents over its workers.
+    """
+    template_path = await get_existing_report_template_path(user_id)
+    rendered = await asyncio.gather(
+        *[
+            render_docx_with_template(template_path, data, patient_name)
+            for data, patient_name in reports
+        ]
+    )
+
+    used_filenames = set()
+    files = [
+        FileData(
+            path_name=unique_filename(filename, used_filenames),
+            extension="docx",
+            file_bytes=docx_content,
+        )
+        for docx_content, filename in rendered
+    ]
+    return await asyncio.to_thread(ConversionUtils.create_zip_archive, files)
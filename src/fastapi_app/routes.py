@@ -1,26 +1,79 @@
 import shutil
-from fastapi import APIRouter, Form, File, UploadFile, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi import (
+    APIRouter,
+    Form,
+    File,
+    UploadFile,
+    Depends,
+    HTTPException,
+    Header,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 import asyncio
-from typing import List, Optional
+from typing import Awaitable, List, Optional
 import base64
+import json
 import os
+import time
 import uuid
 from datetime import datetime, timezone
-from docx import Document
 from pydantic import BaseModel
 from src.fastapi_app.services import (
-    process_single_text,
-    transcribe_single_audio,
+    get_additional_prompt,
+    process_and_save_text,
+    transcribe_process_and_save_audio,
+)
+from src.fastapi_app.dictation import LiveDictationSession
+from src.fastapi_app.reports import (
+    DEFAULT_REPORTS_ARCHIVE_FILENAME,
+    DOCX_MEDIA_TYPE,
+    content_disposition,
+    render_report_docx,
+    render_reports_zip,
+)
+from src.fastapi_app.jobs import audio_job_pool
+from src.fastapi_app.uploads import (
+    get_upload_session_lock,
+    start_upload_pipelines,
+    truncate_upload_file,
+    wait_until_spooled,
+    write_upload_part,
+)
+from src.fastapi_app.schemas import (
+    DocxBatchExportRequest,
+    ProcessJsonRequest,
+    UploadBase64Request,
+)
+from src.fastapi_app.auth import (
+    get_current_user,
+    get_current_admin_user,
+    get_user_from_connection,
+    is_allowed_origin,
 )
-from src.fastapi_app.schemas import ProcessJsonRequest, UploadBase64Request
-from src.fastapi_app.auth import get_current_user, get_current_admin_user
 from src.utils.schemas import LlmStageOutput
-from src.utils.local_docx_formatter import LocalDocxFormatter
-from src.utils.consts import USER_REPORTS_FILES_DIR
-from src.common.models import User, ReportData, TranscriptionProcessingResult, AllowedEmails
+from src.utils.consts import AUDIO_UPLOADS_FILES_DIR, USER_REPORTS_FILES_DIR
+from src.utils.prompt_cache import prompt_cache
+from src.utils.llm_scheduler import llm_scheduler
+from src.utils.llm_usage import llm_usage_stats
+from src.utils.docx_renderer import docx_render_pool
+from src.utils.audio_spool import audio_spool
+from src.common.models import (
+    User,
+    ReportData,
+    TranscriptionProcessingResult,
+    AudioProcessingJob,
+    AudioUploadSession,
+    LlmResultCache,
+    TranscriptionCache,
+    AllowedEmails,
+)
 from src.common.db_facade import DatabaseFacade
-from src.utils.utils import extract_text_from_docx
+from src.common.settings import settings
+from src.utils.utils import cleanup_temp_file, extract_text_from_docx
 
 router = APIRouter(prefix="/api")
 
@@ -33,25 +86,54 @@ class ReportDataUpdate(BaseModel):
     words_spelling: str = ""
 
 
+# Keeps streamed tasks alive if the client disconnects mid-stream
+background_tasks = set()
+
+# Progress lines must reach the client as they are written, X-Accel-Buffering
+# turns off nginx proxy buffering for this response
+NDJSON_STREAM_HEADERS = {"X-Accel-Buffering": "no", "Cache-Control": "no-cache"}
+
+
+async def stream_results_as_completed(jobs: List[tuple[str, Awaitable[dict]]]):
+    """Yield NDJSON line per file as soon as its job finishes, then a summary line"""
+
+    async def run_job(index: int, filename: str, job: Awaitable[dict]) -> dict:
+        try:
+            return {"index": index, "filename": filename, "json_data": await job}
+        except Exception as e:
+            print(f"Error processing {filename}: {str(e)}")
+            return {"index": index, "filename": filename, "error": "Failed to process file"}
+
+    tasks = []
+    for index, (filename, job) in enumerate(jobs):
+        task = asyncio.create_task(run_job(index, filename, job))
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+        tasks.append(task)
+
+    count = 0
+    for next_done in asyncio.as_completed(tasks):
+        event = await next_done
+        if "json_data" in event:
+            count += 1
+        yield json.dumps(event) + "\n"
+
+    yield json.dumps({"done": True, "count": count, "total": len(tasks)}) + "\n"
+
+
 @router.post("/process_text")
 async def process_text(
     text: str = Form(...), current_user: User = Depends(get_current_user)
 ) -> JSONResponse:
     try:
-        llm_result = await process_single_text(text, str(current_user.id))
-
-        # Save result to TranscriptionProcessingResult
-        transcription_facade = DatabaseFacade(TranscriptionProcessingResult)
-        await transcription_facade.create(
-            user_id=str(current_user.id),
-            source_type="text",
-            source_text=text,
-            processing_result=llm_result.model_dump(),
+        # Process and save result to TranscriptionProcessingResult
+        result_dict = await process_and_save_text(
+            text, str(current_user.id), source_type="text", include_source_type=False
         )
 
         return JSONResponse(
             content={
-                "json_data": llm_result.model_dump(),
+                "json_data": result_dict,
             }
         )
 
@@ -90,13 +172,12 @@ async def process_documents(
             else:
                 raise ValueError(f"Unsupported file type: {file.filename}")
 
-            # Add task for async processing
-            task = process_single_text(
-                file_content, str(current_user.id),
+            # Add task for async processing, each task saves its own result
+            task = process_and_save_text(
+                file_content, str(current_user.id), source_type="document",
             )
             tasks[i] = {
                 "task": task,
-                "file_content": file_content,
                 "filename": file.filename
             }
 
@@ -110,23 +191,9 @@ async def process_documents(
             return_exceptions=True,
         )
 
-        # Create results with file information and save to database
-        json_results = []
-        transcription_facade = DatabaseFacade(TranscriptionProcessingResult)
-
-        for i, result in enumerate(task_results):
-            if not isinstance(result, Exception):
-                result_dict = result.model_dump()
-                result_dict["source_type"] = "document"
-                json_results.append(result_dict)
-
-                # Save to database
-                await transcription_facade.create(
-                    user_id=str(current_user.id),
-                    source_type="document",
-                    source_text=tasks[i]['file_content'],
-                    processing_result=result_dict,
-                )
+        json_results = [
+            result for result in task_results if not isinstance(result, Exception)
+        ]
 
         if json_results:
             return JSONResponse(
@@ -148,6 +215,50 @@ async def process_documents(
         )
 
 
+@router.post("/process_documents/stream")
+async def process_documents_stream(
+    request: UploadBase64Request, current_user: User = Depends(get_current_user)
+):
+    """Process documents and stream each file's result as NDJSON when it completes"""
+    jobs = []
+    for file in request.files:
+        if not file.filename.lower().endswith((".txt", ".docx")):
+            continue
+
+        try:
+            file_bytes = base64.b64decode(file.content)
+            if file.filename.lower().endswith(".txt"):
+                file_content = file_bytes.decode("utf-8")
+            else:
+                file_content = extract_text_from_docx(file_bytes)
+        except Exception as decode_error:
+            print(f"Error decoding {file.filename}: {decode_error}")
+            continue
+
+        jobs.append(
+            (
+                file.filename,
+                process_and_save_text(
+                    file_content,
+                    str(current_user.id),
+                    source_type="document",
+                    filename=file.filename,
+                ),
+            )
+        )
+
+    if not jobs:
+        return JSONResponse(
+            content={"error": "No valid documents to process"}, status_code=400
+        )
+
+    return StreamingResponse(
+        stream_results_as_completed(jobs),
+        media_type="application/x-ndjson",
+        headers=NDJSON_STREAM_HEADERS,
+    )
+
+
 @router.post("/process_audio")
 async def process_audio(
     files: List[UploadFile] = File(...), 
@@ -155,85 +266,32 @@ async def process_audio(
     current_user: User = Depends(get_current_user)
 ) -> JSONResponse:
     try:
-        # Prepare transcription tasks for async processing
-        transcription_tasks = {}
-
-        for i, file in enumerate(files):
-            if not file.filename.lower().endswith((".mp3", ".m4a")):
-                continue
-
-            file_content = await file.read()
-            # First gather: transcribe all audio files
-            transcription_task = transcribe_single_audio(file_content, file.filename)
-            transcription_tasks[i] = {
-                "task": transcription_task,
-                "filename": file.filename
-            }
-
-        if not transcription_tasks:
+        audio_files = [
+            file for file in files if file.filename.lower().endswith((".mp3", ".m4a"))
+        ]
+        if not audio_files:
             return JSONResponse(
                 content={"error": "No valid audio files to process"}, status_code=400
             )
 
-        # First asyncio.gather: Transcribe all audio files in parallel
-        transcription_results = await asyncio.gather(
-            *[v['task'] for v in transcription_tasks.values()], 
-            return_exceptions=True,
+        # Each file moves independently through spooling, transcription, LLM stages
+        # and saving, so a short dictation doesn't wait for a long recording
+        pipelines = start_upload_pipelines(
+            audio_files,
+            lambda audio_path, filename: transcribe_process_and_save_audio(
+                audio_path, filename, str(current_user.id), processing_type
+            ),
         )
-
-        # Prepare processing tasks for transcribed texts
-        processing_tasks = {}
-        for i, transcription_result in enumerate(transcription_results):
-            if not isinstance(transcription_result, Exception):
-                # Determine additional prompt based on processing type
-                additional_prompt = None
-                if processing_type == "dictation":
-                    additional_prompt = f"""
-                    "You must keep everything that is dictated exactly as spoken in the letter content, preserving every word. 
-                    However, when explicit field instructions are dictated (that can belong to these fields: {LlmStageOutput.model_fields.keys()}), extract that information to the appropriate field AND remove the explicit field instruction from the letter body. 
-                    The letter should flow naturally without showing the dictated field labels."
-                    """
-                
-                # Second gather: process all transcriptions as text
-                processing_task = process_single_text(
-                    transcription_result, str(current_user.id), additional_prompt=additional_prompt
-                )
-                processing_tasks[i] = {
-                    "task": processing_task,
-                    "transcribed_text": transcription_result,
-                    "filename": transcription_tasks[i]['filename']
-                }
-
-        if not processing_tasks:
-            return JSONResponse(
-                content={"error": "No audio files could be transcribed successfully"},
-                status_code=400,
-            )
-
-        # Second asyncio.gather: Process all transcriptions in parallel
-        processing_results = await asyncio.gather(
-            *[v['task'] for v in processing_tasks.values()], 
-            return_exceptions=True,
+        pipeline_results = await asyncio.gather(
+            *[pipeline.task for pipeline in pipelines], return_exceptions=True
         )
 
-        # Create results with file information and save to database
         json_results = []
-        transcription_facade = DatabaseFacade(TranscriptionProcessingResult)
-
-        for i, result in enumerate(processing_results):
-            if not isinstance(result, Exception):
-                result_dict = result.model_dump()
-                source_type = "audio_dictation" if processing_type == "dictation" else "audio"
-                result_dict["source_type"] = source_type
-                json_results.append(result_dict)
-
-                # Save to database
-                await transcription_facade.create(
-                    user_id=str(current_user.id),
-                    source_type=source_type,
-                    source_text=processing_tasks[i]['transcribed_text'],
-                    processing_result=result_dict,
-                )
+        for result in pipeline_results:
+            if isinstance(result, Exception):
+                print(f"Error processing audio file: {str(result)}")
+            else:
+                json_results.append(result)
 
         if json_results:
             return JSONResponse(
@@ -255,98 +313,517 @@ async def process_audio(
         )
 
 
-@router.post("/download_docx")
-async def download_docx(
-    request: dict, current_user: User = Depends(get_current_user)
-) -> JSONResponse:
+@router.post("/process_audio/stream")
+async def process_audio_stream(
+    files: List[UploadFile] = File(...),
+    processing_type: str = Form("transcription"),
+    current_user: User = Depends(get_current_user),
+):
+    """Process audio files and stream each file's result as NDJSON when it completes"""
+    audio_files = [
+        file for file in files if file.filename.lower().endswith((".mp3", ".m4a"))
+    ]
+    if not audio_files:
+        return JSONResponse(
+            content={"error": "No valid audio files to process"}, status_code=400
+        )
+
+    pipelines = start_upload_pipelines(
+        audio_files,
+        lambda audio_path, filename: transcribe_process_and_save_audio(
+            audio_path, filename, str(current_user.id), processing_type
+        ),
+    )
+    # Copy out before streaming starts, upload files are closed after the handler returns
+    await wait_until_spooled(pipelines)
+    jobs = [(pipeline.filename, pipeline.task) for pipeline in pipelines]
+
+    return StreamingResponse(
+        stream_results_as_completed(jobs),
+        media_type="application/x-ndjson",
+        headers=NDJSON_STREAM_HEADERS,
+    )
+
+
+def serialize_audio_job(job: AudioProcessingJob) -> dict:
+    return {
+        "job_id": str(job.id),
+        "filename": job.filename,
+        "processing_type": job.processing_type,
+        "status": job.status,
+        "stage": job.stage,
+        "progress": job.progress,
+        "attempts": job.attempts,
+        "error": job.error,
+        "created_at": job.created_at.isoformat(),
+        "updated_at": job.updated_at.isoformat(),
+    }
+
+
+async def get_user_audio_job(job_id: str, current_user: User) -> AudioProcessingJob:
+    job_facade = DatabaseFacade(AudioProcessingJob)
+    job = await job_facade.get_by_id(job_id)
+    if not job or job.user_id != str(current_user.id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@router.post("/jobs/process_audio")
+async def submit_audio_jobs(
+    files: List[UploadFile] = File(...),
+    processing_type: str = Form("transcription"),
+    current_user: User = Depends(get_current_user),
+):
+    """Queue audio files for background processing and return job ids right away"""
     try:
-        # Extract data and patient_name from request
-        data = LlmStageOutput(**request.get('data', {}))
-        patient_name = request.get('patient_name')
-        
-        # Get user-specific template path or default
-        from src.utils.utils import load_prompt_files, load_default_prompt_files_data
+        jobs = []
+        for file in files:
+            if not file.filename.lower().endswith((".mp3", ".m4a")):
+                continue
 
-        try:
-            user_prompts = await load_prompt_files(str(current_user.id))
-            template_path = user_prompts.get(
-                "report_file_url", "files/default_docx_report.docx"
+            job = await audio_job_pool.submit(
+                str(current_user.id), file, processing_type
+            )
+            jobs.append({"job_id": str(job.id), "filename": job.filename})
+
+        if not jobs:
+            return JSONResponse(
+                content={"error": "No valid audio files to process"}, status_code=400
             )
 
-            # Handle user-specific files path
-            if template_path and not template_path.startswith("files/"):
-                template_path = os.path.join("files/user_reports", template_path)
-        except Exception:
-            # Fallback to default
-            template_path = "files/default_docx_report.docx"
+        return JSONResponse(content={"jobs": jobs}, status_code=202)
+
+    except Exception as e:
+        print(f"Error submitting audio jobs: {str(e)}")
+        return JSONResponse(
+            content={"error": "Failed to submit audio files"}, status_code=500
+        )
+
+
+@router.get("/jobs/{job_id}")
+async def get_audio_job_status(
+    job_id: str, current_user: User = Depends(get_current_user)
+):
+    """Get background audio job status and per-stage progress"""
+    try:
+        job = await get_user_audio_job(job_id, current_user)
+        return JSONResponse(content=serialize_audio_job(job))
 
-        if not os.path.exists(template_path):
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error getting audio job: {str(e)}")
+        return JSONResponse(content={"error": "Failed to get job"}, status_code=500)
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_audio_job_result(
+    job_id: str, current_user: User = Depends(get_current_user)
+):
+    """Get result of a completed background audio job"""
+    try:
+        job = await get_user_audio_job(job_id, current_user)
+
+        if job.status == "failed":
             return JSONResponse(
-                content={"error": "DOCX template not found"}, status_code=500
-            )
-
-        # Load template document
-        doc = Document(template_path)
-
-        # Initialize formatter
-        formatter = LocalDocxFormatter()
-
-        # Replace placeholders with values from LlmStageOutput
-        data_dict = data.model_dump()
-        for key, value in data_dict.items():
-            if value is not None:
-                placeholder = "{" + key + "}"
-                # Convert value to string, handle None values
-                str_value = str(value) if value is not None else ""
-                formatter.replace_all(doc, placeholder, str_value, html=True)
-
-        # Save to temporary file and encode to base64
-        temp_path = "/tmp/filled_report.docx"
-        doc.save(temp_path)
-
-        with open(temp_path, "rb") as file:
-            docx_content = file.read()
-            base64_content = base64.b64encode(docx_content).decode("utf-8")
-
-        # Clean up temp file
-        os.remove(temp_path)
-
-        # Extract patient name for filename
-        final_patient_name = patient_name
-        if not final_patient_name:
-            # Fallback to extracting from recipients_info
-            recipients_info = data_dict.get("recipients_info", "").strip()
-            if recipients_info:
-                # Convert HTML to text and take first line only
-                import re
-                # Remove HTML tags
-                text_only = re.sub(r'<[^>]+>', '', recipients_info)
-                # Take first line only
-                first_line = text_only.split("\n")[0]
-                final_patient_name = first_line.strip() if first_line else None
-        
-        if final_patient_name:
-            # Remove "Patient Name:" prefix if present
-            import re
-            cleaned_name = re.sub(r'^Patient Name:\s*', '', final_patient_name, flags=re.IGNORECASE)
-            
-            # Clean patient name for safe filename - preserve hashtags, allow spaces
-            # Remove only characters that are truly unsafe for filenames
-            safe_name = re.sub(r'[<>:"/\\|?*]', '', cleaned_name)
-            safe_name = safe_name.strip()
-            
-            # Only use the patient name if it's not empty after cleaning
-            if safe_name:
-                filename = safe_name + ".docx"
-            else:
-                filename = "medical_report.docx"
-        else:
-            filename = "medical_report.docx"
+                content={"error": "Job failed", "status": job.status}, status_code=500
+            )
+        if job.status != "completed":
+            return JSONResponse(
+                content={"error": "Job is not completed yet", "status": job.status},
+                status_code=409,
+            )
+
+        return JSONResponse(content={"json_data": job.result, "status": job.status})
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error getting audio job result: {str(e)}")
+        return JSONResponse(
+            content={"error": "Failed to get job result"}, status_code=500
+        )
+
+
+def serialize_upload_session(upload_session: AudioUploadSession) -> dict:
+    return {
+        "upload_id": str(upload_session.id),
+        "filename": upload_session.filename,
+        "status": upload_session.status,
+        "total_size": upload_session.total_size,
+        "offset": upload_session.received_bytes,
+        "next_part": len(upload_session.part_checksums),
+        "part_max_bytes": settings.UPLOAD_PART_MAX_MB * 1024 * 1024,
+        "job_id": upload_session.job_id,
+    }
+
+
+async def get_user_upload_session(
+    upload_id: str, current_user: User
+) -> AudioUploadSession:
+    upload_session_facade = DatabaseFacade(AudioUploadSession)
+    upload_session = await upload_session_facade.get_by_id(upload_id)
+    if not upload_session or upload_session.user_id != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found"
+        )
+    return upload_session
+
+
+@router.post("/uploads")
+async def create_upload_session(
+    filename: str = Form(...),
+    total_size: int = Form(...),
+    processing_type: str = Form("transcription"),
+    current_user: User = Depends(get_current_user),
+):
+    """Start resumable upload of a recording, parts are sent with PUT /uploads/{id}/parts/{n}"""
+    try:
+        if not filename.lower().endswith((".mp3", ".m4a")):
+            return JSONResponse(
+                content={"error": "Only .mp3 and .m4a files are supported"},
+                status_code=400,
+            )
+        if total_size <= 0 or total_size > settings.UPLOAD_MAX_MB * 1024 * 1024:
+            return JSONResponse(
+                content={"error": f"File size must be up to {settings.UPLOAD_MAX_MB} MB"},
+                status_code=413,
+            )
 
+        os.makedirs(AUDIO_UPLOADS_FILES_DIR, exist_ok=True)
+        file_ext = os.path.splitext(filename)[1]
+        audio_path = os.path.join(AUDIO_UPLOADS_FILES_DIR, f"{uuid.uuid4().hex}{file_ext}")
+        open(audio_path, "wb").close()
+
+        upload_session_facade = DatabaseFacade(AudioUploadSession)
+        upload_session = await upload_session_facade.create(
+            user_id=str(current_user.id),
+            filename=filename,
+            processing_type=processing_type,
+            total_size=total_size,
+            audio_path=audio_path,
+        )
+        return JSONResponse(
+            content=serialize_upload_session(upload_session), status_code=201
+        )
+
+    except Exception as e:
+        print(f"Error creating upload session: {str(e)}")
+        return JSONResponse(
+            content={"error": "Failed to create upload"}, status_code=500
+        )
+
+
+@router.get("/uploads/{upload_id}")
+async def get_upload_session(
+    upload_id: str, current_user: User = Depends(get_current_user)
+):
+    """Get offset and next part number to resume an interrupted upload from"""
+    try:
+        upload_session = await get_user_upload_session(upload_id, current_user)
+        return JSONResponse(content=serialize_upload_session(upload_session))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error getting upload session: {str(e)}")
+        return JSONResponse(content={"error": "Failed to get upload"}, status_code=500)
+
+
+@router.put("/uploads/{upload_id}/parts/{part_number}")
+async def upload_part(
+    upload_id: str,
+    part_number: int,
+    request: Request,
+    part_checksum: str = Header(..., alias="X-Part-Checksum"),
+    current_user: User = Depends(get_current_user),
+):
+    """Append part to the upload, request body is the raw part and the header its sha256.
+
+    Parts are numbered from 0 and must arrive in order. Re-sending a committed
+    part with the same checksum is a no-op, so clients can retry safely.
+    """
+    try:
+        # Check the session first so unknown ids never get a lock
+        await get_user_upload_session(upload_id, current_user)
+        async with get_upload_session_lock(upload_id):
+            upload_session = await get_user_upload_session(upload_id, current_user)
+            next_part = len(upload_session.part_checksums)
+            part_checksum = part_checksum.lower()
+
+            if upload_session.status != "uploading":
+                return JSONResponse(
+                    content={"error": "Upload is already finalized"}, status_code=409
+                )
+            if part_number < next_part:
+                if upload_session.part_checksums[part_number] == part_checksum:
+                    return JSONResponse(content=serialize_upload_session(upload_session))
+                return JSONResponse(
+                    content={
+                        "error": "Part was already received with a different checksum",
+                        **serialize_upload_session(upload_session),
+                    },
+                    status_code=409,
+                )
+            if part_number > next_part:
+                return JSONResponse(
+                    content={
+                        "error": f"Expected part {next_part}",
+                        **serialize_upload_session(upload_session),
+                    },
+                    status_code=409,
+                )
+
+            offset = upload_session.received_bytes
+            try:
+                size, checksum = await write_upload_part(
+                    upload_session.audio_path,
+                    offset,
+                    request.stream(),
+                    max_bytes=min(
+                        settings.UPLOAD_PART_MAX_MB * 1024 * 1024,
+                        upload_session.total_size - offset,
+                    ),
+                )
+            except ValueError as e:
+                await asyncio.to_thread(
+                    truncate_upload_file, upload_session.audio_path, offset
+                )
+                return JSONResponse(content={"error": str(e)}, status_code=413)
+
+            if checksum != part_checksum:
+                await asyncio.to_thread(
+                    truncate_upload_file, upload_session.audio_path, offset
+                )
+                return JSONResponse(
+                    content={"error": "Checksum mismatch, send the part again"},
+                    status_code=400,
+                )
+
+            upload_session.received_bytes = offset + size
+            upload_session.part_checksums.append(checksum)
+            upload_session.updated_at = datetime.now(timezone.utc)
+            await upload_session.save()
+            return JSONResponse(content=serialize_upload_session(upload_session))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error uploading part: {str(e)}")
+        return JSONResponse(content={"error": "Failed to upload part"}, status_code=500)
+
+
+@router.post("/uploads/{upload_id}/finalize")
+async def finalize_upload(
+    upload_id: str, current_user: User = Depends(get_current_user)
+):
+    """Queue the assembled recording as a background audio job, see GET /jobs/{job_id}"""
+    try:
+        # Check the session first so unknown ids never get a lock
+        await get_user_upload_session(upload_id, current_user)
+        async with get_upload_session_lock(upload_id):
+            upload_session = await get_user_upload_session(upload_id, current_user)
+            if upload_session.status == "finalized":
+                return JSONResponse(
+                    content=serialize_upload_session(upload_session), status_code=202
+                )
+            if upload_session.received_bytes != upload_session.total_size:
+                return JSONResponse(
+                    content={
+                        "error": "Upload is not complete",
+                        **serialize_upload_session(upload_session),
+                    },
+                    status_code=409,
+                )
+
+            job = await audio_job_pool.submit_file(
+                upload_session.user_id,
+                upload_session.filename,
+                upload_session.processing_type,
+                upload_session.audio_path,
+            )
+            upload_session.status = "finalized"
+            upload_session.job_id = str(job.id)
+            upload_session.updated_at = datetime.now(timezone.utc)
+            await upload_session.save()
+
+        return JSONResponse(
+            content=serialize_upload_session(upload_session), status_code=202
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error finalizing upload: {str(e)}")
+        return JSONResponse(
+            content={"error": "Failed to finalize upload"}, status_code=500
+        )
+
+
+@router.delete("/uploads/{upload_id}")
+async def abort_upload(upload_id: str, current_user: User = Depends(get_current_user)):
+    """Abort unfinished upload and remove received parts"""
+    try:
+        # Check the session first so unknown ids never get a lock
+        await get_user_upload_session(upload_id, current_user)
+        async with get_upload_session_lock(upload_id):
+            upload_session = await get_user_upload_session(upload_id, current_user)
+            if upload_session.status == "uploading" and os.path.exists(
+                upload_session.audio_path
+            ):
+                cleanup_temp_file(upload_session.audio_path)
+            await upload_session.delete()
+
+        return JSONResponse(content={"message": "Upload deleted successfully"})
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error deleting upload: {str(e)}")
+        return JSONResponse(content={"error": "Failed to delete upload"}, status_code=500)
+
+
+async def send_live_transcript(websocket: WebSocket, session: LiveDictationSession):
+    """Transcribe segments that are ready and send the running transcript after each"""
+    try:
+        while await session.transcribe_next_segment():
+            await websocket.send_json(
+                {
+                    "type": "transcript",
+                    "text": session.transcript,
+                    "audio_sec": session.transcribed_sec,
+                }
+            )
+    except Exception as e:
+        # Not fatal, the segment is transcribed again on the next step or at the end
+        print(f"Error in live transcription: {str(e)}")
+
+
+@router.websocket("/dictation/live")
+async def live_dictation(websocket: WebSocket, ext: str = "webm"):
+    """Transcribe a recording while it is in progress.
+
+    The client sends MediaRecorder timeslices as binary messages and receives
+    {"type": "transcript"} updates. A {"type": "process", "processing_type": ...}
+    message ends the recording, the remaining audio is transcribed and processed
+    with LLM, and the result is sent as {"type": "result", "json_data": ...}.
+    """
+    if not is_allowed_origin(websocket):
+        print(f"Rejected live dictation from origin {websocket.headers.get('origin')}")
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    try:
+        current_user = await get_user_from_connection(websocket)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    transcribe_task = None
+    file_ext = "." + "".join(char for char in ext if char.isalnum())
+    with audio_spool.reserve(file_ext, None) as audio_path:
+        session = LiveDictationSession(audio_path)
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+
+                if message.get("bytes"):
+                    await session.append(message["bytes"])
+                    if transcribe_task is None or transcribe_task.done():
+                        transcribe_task = asyncio.create_task(
+                            send_live_transcript(websocket, session)
+                        )
+                    continue
+
+                command = json.loads(message.get("text") or "{}")
+                if command.get("type") == "discard":
+                    break
+                if command.get("type") != "process":
+                    continue
+
+                if session.received_bytes == 0:
+                    await websocket.send_json(
+                        {"type": "error", "error": "No audio received"}
+                    )
+                    break
+
+                processing_type = command.get("processing_type", "dictation")
+                start_time = time.perf_counter()
+                if transcribe_task:
+                    await transcribe_task
+                transcribed_text = await session.finish()
+                # Only the tail of the recording is transcribed after it ends
+                transcription_wall_time_sec = time.perf_counter() - start_time
+                await websocket.send_json(
+                    {
+                        "type": "transcript",
+                        "text": transcribed_text,
+                        "audio_sec": session.transcribed_sec,
+                    }
+                )
+
+                source_type = "audio_dictation" if processing_type == "dictation" else "audio"
+                result = await process_and_save_text(
+                    transcribed_text,
+                    str(current_user.id),
+                    source_type=source_type,
+                    filename=command.get("filename") or f"recording{file_ext}",
+                    additional_prompt=get_additional_prompt(processing_type),
+                    transcription_wall_time_sec=transcription_wall_time_sec,
+                )
+                await websocket.send_json({"type": "result", "json_data": result})
+                break
+
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            print(f"Error in live dictation: {str(e)}")
+            try:
+                await websocket.send_json(
+                    {"type": "error", "error": "Failed to process recording"}
+                )
+            except Exception:
+                pass
+        finally:
+            if transcribe_task and not transcribe_task.done():
+                transcribe_task.cancel()
+                await asyncio.gather(transcribe_task, return_exceptions=True)
+
+    try:
+        await websocket.close()
+    except RuntimeError:
+        # Already closed by the client
+        pass
+
+
+@router.post("/download_docx")
+async def download_docx(
+    request: dict, current_user: User = Depends(get_current_user)
+) -> JSONResponse:
+    """Filled DOCX report as base64 in JSON, kept for existing clients"""
+    try:
+        docx_content, filename = await render_report_docx(
+            str(current_user.id),
+            LlmStageOutput(**request.get("data", {})),
+            request.get("patient_name"),
+        )
+        base64_content = base64.b64encode(docx_content).decode("utf-8")
         return JSONResponse(
             content={"docx_base64": base64_content, "filename": filename}
         )
 
+    except FileNotFoundError:
+        return JSONResponse(
+            content={"error": "DOCX template not found"}, status_code=500
+        )
+    except TimeoutError as e:
+        print(f"Timeout in download_docx endpoint: {str(e)}")
+        return JSONResponse(
+            content={"error": "DOCX generation timed out"}, status_code=504
+        )
     except Exception as e:
         print(f"Error in download_docx endpoint: {str(e)}")
         return JSONResponse(
@@ -354,6 +831,106 @@ async def download_docx(
         )
 
 
+@router.post("/download_docx_file")
+async def download_docx_file(
+    request: dict, current_user: User = Depends(get_current_user)
+) -> Response:
+    """Filled DOCX report as a binary attachment named after the patient"""
+    try:
+        docx_content, filename = await render_report_docx(
+            str(current_user.id),
+            LlmStageOutput(**request.get("data", {})),
+            request.get("patient_name"),
+        )
+        return Response(
+            content=docx_content,
+            media_type=DOCX_MEDIA_TYPE,
+            headers={"Content-Disposition": content_disposition(filename)},
+        )
+
+    except FileNotFoundError:
+        return JSONResponse(
+            content={"error": "DOCX template not found"}, status_code=500
+        )
+    except TimeoutError as e:
+        print(f"Timeout in download_docx_file endpoint: {str(e)}")
+        return JSONResponse(
+            content={"error": "DOCX generation timed out"}, status_code=504
+        )
+    except Exception as e:
+        print(f"Error in download_docx_file endpoint: {str(e)}")
+        return JSONResponse(
+            content={"error": "Failed to generate DOCX document"}, status_code=500
+        )
+
+
+@router.post("/download_docx_zip")
+async def download_docx_zip(
+    request: DocxBatchExportRequest, current_user: User = Depends(get_current_user)
+) -> Response:
+    """Render several reports, given directly or as history ids, into one ZIP"""
+    try:
+        total = len(request.results) + len(request.history_ids)
+        if not total:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No results to export",
+            )
+        if total > settings.DOCX_BATCH_MAX_ITEMS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {settings.DOCX_BATCH_MAX_ITEMS} reports can be exported at once",
+            )
+
+        reports = [
+            (LlmStageOutput(**item.data), item.patient_name)
+            for item in request.results
+        ]
+
+        transcription_facade = DatabaseFacade(TranscriptionProcessingResult)
+        history_results = await asyncio.gather(
+            *[
+                transcription_facade.get_by_id(result_id)
+                for result_id in request.history_ids
+            ]
+        )
+        for result in history_results:
+            if not result or result.user_id != str(current_user.id):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="Result not found"
+                )
+            reports.append((LlmStageOutput(**result.processing_result), None))
+
+        zip_content = await render_reports_zip(str(current_user.id), reports)
+        return Response(
+            content=zip_content,
+            media_type="application/zip",
+            headers={
+                "Content-Disposition": content_disposition(
+                    DEFAULT_REPORTS_ARCHIVE_FILENAME,
+                    DEFAULT_REPORTS_ARCHIVE_FILENAME,
+                )
+            },
+        )
+
+    except HTTPException:
+        raise
+    except FileNotFoundError:
+        return JSONResponse(
+            content={"error": "DOCX template not found"}, status_code=500
+        )
+    except TimeoutError as e:
+        print(f"Timeout in download_docx_zip endpoint: {str(e)}")
+        return JSONResponse(
+            content={"error": "DOCX generation timed out"}, status_code=504
+        )
+    except Exception as e:
+        print(f"Error in download_docx_zip endpoint: {str(e)}")
+        return JSONResponse(
+            content={"error": "Failed to generate DOCX documents"}, status_code=500
+        )
+
+
 @router.get("/report-data")
 async def get_report_data(current_user: User = Depends(get_current_user)):
     """Get current user's report data"""
@@ -418,6 +995,7 @@ async def update_report_data(
                 words_spelling=data.words_spelling,
                 updated_at=datetime.now(timezone.utc),
             )
+        prompt_cache.invalidate(str(current_user.id))
 
         return JSONResponse(content={"message": "Report data updated successfully"})
     except Exception as e:
@@ -480,6 +1058,7 @@ async def upload_report_file(
                 words_spelling=default_data.get("words_spelling", ""),
                 report_file_url=relative_path,
             )
+        prompt_cache.invalidate(str(current_user.id))
 
         return JSONResponse(
             content={
@@ -515,6 +1094,7 @@ async def delete_report_file(current_user: User = Depends(get_current_user)):
             report_file_url=None,
             updated_at=datetime.now(timezone.utc),
         )
+        prompt_cache.invalidate(str(current_user.id))
 
         return JSONResponse(content={"message": "File deleted successfully"})
     except Exception as e:
@@ -597,11 +1177,34 @@ async def delete_user(user_id: str, email: str = Form(...), password: str = Form
         # Delete report data
         report_facade = DatabaseFacade(ReportData)
         await report_facade.delete_many(user_id=user_id)
+        prompt_cache.invalidate(user_id)
 
         # Delete transcription results
         transcription_facade = DatabaseFacade(TranscriptionProcessingResult)
         await transcription_facade.delete_many(user_id=user_id)
 
+        # Delete background audio jobs
+        job_facade = DatabaseFacade(AudioProcessingJob)
+        await job_facade.delete_many(user_id=user_id)
+
+        # Delete unfinished resumable uploads
+        upload_session_facade = DatabaseFacade(AudioUploadSession)
+        upload_sessions = await upload_session_facade.get_many(
+            filters={"user_id": user_id}
+        )
+        for upload_session in upload_sessions:
+            if os.path.exists(upload_session.audio_path):
+                cleanup_temp_file(upload_session.audio_path)
+        await upload_session_facade.delete_many(user_id=user_id)
+
+        # Delete memoized LLM results
+        result_cache_facade = DatabaseFacade(LlmResultCache)
+        await result_cache_facade.delete_many(user_id=user_id)
+
+        # Delete cached transcripts
+        transcription_cache_facade = DatabaseFacade(TranscriptionCache)
+        await transcription_cache_facade.delete_many(user_id=user_id)
+
         # Delete user files directory if exists
         user_dir = os.path.join(USER_REPORTS_FILES_DIR, user_id)
         if os.path.exists(user_dir):
@@ -688,6 +1291,71 @@ async def get_user_history(
         )
 
 
+@router.get("/usage")
+async def get_user_usage(current_user: User = Depends(get_current_user)):
+    """Get current user's LLM token usage and timings aggregated per source type"""
+    try:
+        transcription_facade = DatabaseFacade(TranscriptionProcessingResult)
+        rows = await transcription_facade.aggregate(
+            [
+                {"$match": {"user_id": str(current_user.id), "usage": {"$ne": None}}},
+                {
+                    "$group": {
+                        "_id": "$source_type",
+                        "results": {"$sum": 1},
+                        "memoized_results": {
+                            "$sum": {"$cond": ["$usage.memoized", 1, 0]}
+                        },
+                        "input_tokens": {"$sum": "$usage.input_tokens"},
+                        "output_tokens": {"$sum": "$usage.output_tokens"},
+                        "cache_read_tokens": {"$sum": "$usage.cache_read_tokens"},
+                        "cache_creation_tokens": {
+                            "$sum": "$usage.cache_creation_tokens"
+                        },
+                        # Results stored before the rename only have llm_wall_time_sec
+                        "avg_llm_response_time_sec": {
+                            "$avg": {
+                                "$ifNull": [
+                                    "$usage.llm_response_time_sec",
+                                    "$usage.llm_wall_time_sec",
+                                ]
+                            }
+                        },
+                        "avg_transcription_wall_time_sec": {
+                            "$avg": "$usage.transcription_wall_time_sec"
+                        },
+                        "avg_transcription_wait_sec": {
+                            "$avg": "$usage.transcription_wait_sec"
+                        },
+                    }
+                },
+            ]
+        )
+
+        by_source_type = {row.pop("_id"): row for row in rows}
+        totals = {
+            key: sum(row[key] for row in by_source_type.values())
+            for key in (
+                "results",
+                "memoized_results",
+                "input_tokens",
+                "output_tokens",
+                "cache_read_tokens",
+                "cache_creation_tokens",
+            )
+        }
+
+        return JSONResponse(
+            content={"totals": totals, "by_source_type": by_source_type}
+        )
+
+    except Exception as e:
+        print(f"Error getting user usage: {str(e)}")
+        return JSONResponse(
+            content={"error": "Failed to get usage"}, status_code=500
+        )
+
+
 @router.get("/history/{result_id}")
 async def get_history_item(
     result_id: str, current_user: User = Depends(get_current_user)
@@ -785,3 +1453,54 @@ async def update_allowed_emails(
         return JSONResponse(
             content={"error": "Failed to update allowed emails"}, status_code=500
         )
+
+
+@router.post("/admin/llm-metrics")
+async def get_llm_metrics(email: str = Form(...), password: str = Form(...)):
+    """Get LLM scheduler and token usage metrics (admin only)"""
+    try:
+        # Verify admin credentials
+        admin = await get_current_admin_user(email, password)
+        if not admin:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid admin credentials",
+            )
+
+        return JSONResponse(
+            content={
+                "scheduler": llm_scheduler.snapshot(),
+                "usage": llm_usage_stats.snapshot(),
+            }
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error getting LLM metrics: {str(e)}")
+        return JSONResponse(
+            content={"error": "Failed to get LLM metrics"}, status_code=500
+        )
+
+
+@router.post("/admin/docx-metrics")
+async def get_docx_metrics(email: str = Form(...), password: str = Form(...)):
+    """Get DOCX render pool metrics (admin only)"""
+    try:
+        # Verify admin credentials
+        admin = await get_current_admin_user(email, password)
+        if not admin:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid admin credentials",
+            )
+
+        return JSONResponse(content={"render_pool": docx_render_pool.snapshot()})
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error getting DOCX metrics: {str(e)}")
+        return JSONResponse(
+            content={"error": "Failed to get DOCX metrics"}, status_code=500
+        )
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 
@@ -13,3 +15,13 @@ class UploadBase64Request(BaseModel):
 
 class ProcessJsonRequest(BaseModel):
     document: dict
+
+
+class DocxExportItem(BaseModel):
+    data: dict
+    patient_name: Optional[str] = None
+
+
+class DocxBatchExportRequest(BaseModel):
+    results: list[DocxExportItem] = []
+    history_ids: list[str] = []
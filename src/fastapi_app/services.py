@@ -1,78 +1,218 @@
+import asyncio
+import hashlib
 import json
 import os
+import time
 import traceback
+from functools import lru_cache
+from typing import Optional
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_anthropic import ChatAnthropic
 
 from src.common.settings import settings
-from src.common.models import User
+from src.common.models import User, LlmResultCache, TranscriptionProcessingResult
 from src.common.db_facade import DatabaseFacade
 from src.utils.schemas import LlmStageOutput
+from src.utils.prompt_cache import CompiledPrompts, prompt_cache
+from src.utils.llm_usage import LlmCallUsage, llm_usage_stats, summarize_usage
+from src.utils.llm_scheduler import estimate_tokens, llm_scheduler
+from src.utils.transcript_cache import TranscriptCache, hash_audio_file
 from src.utils.utils import (
+    ProgressCallback,
     extract_text_from_docx,
     load_prompt_files,
-    transcribe_audio_with_openai,
+    transcribe_audio_file,
     load_default_prompt_files_data,
 )
 
-llm = ChatAnthropic(
-    model="claude-sonnet-4-20250514",
-    api_key=settings.ANTHROPIC_API_KEY,
-    max_tokens=64_000,
-)
+llm_kwargs = {}
+if settings.ANTHROPIC_API_URL:
+    llm_kwargs["base_url"] = settings.ANTHROPIC_API_URL
 
-structured_llm = llm.with_structured_output(LlmStageOutput)
+# Output budgets are rounded up to these buckets so only a few clients are ever built
+MAX_TOKENS_BUCKETS = (2_048, 4_096, 8_192, 16_384, 32_768, 64_000)
 
+# Bounds concurrent audio transcriptions across requests, LLM stages are bounded by llm_scheduler
+transcription_semaphore = asyncio.Semaphore(settings.AUDIO_TRANSCRIPTION_CONCURRENCY)
 
 
-async def process_stage_one(text: str, user_id: str = None, additional_prompt: str = None) -> LlmStageOutput:
-    """First stage of processing - extract structured data"""
+@lru_cache(maxsize=len(MAX_TOKENS_BUCKETS))
+def get_structured_llm(max_tokens: int):
+    """Get structured LLM with given output budget"""
+    llm = ChatAnthropic(
+        model="claude-sonnet-4-20250514",
+        api_key=settings.ANTHROPIC_API_KEY,
+        max_tokens=max_tokens,
+        **llm_kwargs,
+    )
+    # include_raw keeps the AIMessage so we can read token usage and cache stats
+    return llm.with_structured_output(LlmStageOutput, include_raw=True)
+
+
+def get_max_tokens(stage: str, input_text: str) -> int:
+    """Derive output budget from the size of per-request input and the stage"""
+    input_tokens = len(input_text) // 4
+    if stage == "stage_two":
+        # Stage two returns the stage one JSON, possibly with fixes
+        needed = 1_024 + int(input_tokens * 1.5)
+    else:
+        # Letter and fields are never much longer than the transcript itself
+        needed = 1_024 + input_tokens
+    for bucket in MAX_TOKENS_BUCKETS:
+        if bucket >= needed:
+            return bucket
+    return MAX_TOKENS_BUCKETS[-1]
+
+
+
+async def load_user_prompt_data(user_id: str = None) -> dict:
+    """Load prompt files for user with fallback to superadmin or default data"""
+    # Try to use specific user's data if user_id provided
+    if user_id:
+        try:
+            return await load_prompt_files(user_id)
+        except Exception:
+            # If user-specific data fails, fallback to superadmin or default
+            pass
+
     try:
-        # Try to use specific user's data if user_id provided
-        if user_id:
-            try:
-                data = await load_prompt_files(user_id)
-            except Exception:
-                # If user-specific data fails, fallback to superadmin or default
-                try:
-                    user_facade = DatabaseFacade(User)
-                    superadmin = await user_facade.get_one(is_superuser=True)
-                    if superadmin:
-                        data = await load_prompt_files(str(superadmin.id))
-                    else:
-                        data = load_default_prompt_files_data()
-                except Exception:
-                    data = load_default_prompt_files_data()
-        else:
-            # Fallback behavior when no user_id provided
-            try:
-                user_facade = DatabaseFacade(User)
-                superadmin = await user_facade.get_one(is_superuser=True)
-                if superadmin:
-                    data = await load_prompt_files(str(superadmin.id))
-                else:
-                    data = load_default_prompt_files_data()
-            except Exception:
-                # Fallback to default data if MongoDB is not available
-                data = load_default_prompt_files_data()
+        user_facade = DatabaseFacade(User)
+        superadmin = await user_facade.get_one(is_superuser=True)
+        if superadmin:
+            return await load_prompt_files(str(superadmin.id))
+        return load_default_prompt_files_data()
+    except Exception:
+        # Fallback to default data if MongoDB is not available
+        return load_default_prompt_files_data()
+
+
+def compile_prompts(data: dict) -> CompiledPrompts:
+    """Build stage one and stage two system messages from prompt files data"""
+    format_data = {
+        "words_spelling": data["words_spelling"],
+        "few_shot_examples": data["examples"],
+        "important_notes": data["important_notes"],
+    }
+    stage_one_system_message = data["few_shot_prompt"]
+    for key, value in format_data.items():
+        stage_one_system_message = stage_one_system_message.replace(
+            "{" + key + "}", value
+        )
+
+    stage_two_system_message = f"""
+        # Role
+        You are a doctor assistant who checks if final report is correct up to important notes
+        
+        # Goal 
+        Below is generated final report for my patient
+        Your task is check if final report is correct up to important notes
+        Return JSON with fixed fields. If nothing to fix, return as it is. Do not write anything else.
+        Note: patient letter must not have any other fields content, only letter content
         
-        # Prepare system message
-        format_data = {
-            "words_spelling": data["words_spelling"],
-            "few_shot_examples": data["examples"],
-            "important_notes": data["important_notes"],
-        }
-        system_message = data["few_shot_prompt"]
-        for key, value in format_data.items():
-            system_message = system_message.replace("{" + key + "}", value)
+        # Important notes 
+        {json.dumps(data['important_notes'])}
+        """
+
+    version = hashlib.sha256(
+        f"{stage_one_system_message}\0{stage_two_system_message}".encode("utf-8")
+    ).hexdigest()
+
+    return CompiledPrompts(
+        stage_one_system_message=stage_one_system_message,
+        stage_two_system_message=stage_two_system_message,
+        report_file_url=data.get("report_file_url", "files/default_docx_report.docx"),
+        version=version,
+        updated_at=data.get("updated_at"),
+        loaded_at=time.monotonic(),
+    )
+
+
+async def get_compiled_prompts(user_id: str = None) -> CompiledPrompts:
+    """Get compiled system messages for user from the in-process prompt cache"""
+    return await prompt_cache.get_or_load(
+        user_id or "",
+        loader=lambda: load_user_prompt_data(user_id),
+        compiler=compile_prompts,
+    )
+
+
+def build_system_message(cached_prefix: str, suffix: str = None) -> SystemMessage:
+    """Build system message with a stable prefix marked for Anthropic prompt caching"""
+    prefix_block = {"type": "text", "text": cached_prefix}
+    if settings.ANTHROPIC_PROMPT_CACHING:
+        prefix_block["cache_control"] = {"type": "ephemeral"}
+
+    content = [prefix_block]
+    if suffix:
+        # Per-request part goes after the cache breakpoint and stays uncached
+        content.append({"type": "text", "text": suffix})
+    return SystemMessage(content=content)
+
+
+async def invoke_structured_llm(
+    messages: list,
+    stage: str,
+    user_id: str = None,
+    usage_log: list[LlmCallUsage] = None,
+) -> LlmStageOutput:
+    """Invoke structured LLM through the shared scheduler and record token usage for the call"""
+    max_tokens = get_max_tokens(stage, messages[-1].content)
+
+    while True:
+        async with llm_scheduler.admit(user_id, estimate_tokens(messages)):
+            start_time = time.perf_counter()
+            result = await get_structured_llm(max_tokens).ainvoke(messages)
+            response_time_sec = time.perf_counter() - start_time
+
+        usage = LlmCallUsage.from_message(
+            stage, result["raw"], response_time_sec, max_tokens=max_tokens
+        )
+        llm_usage_stats.record(usage)
+        if usage_log is not None:
+            usage_log.append(usage)
+        print(
+            f"{stage} usage: input={usage.input_tokens} output={usage.output_tokens} "
+            f"cache_read={usage.cache_read_tokens} cache_creation={usage.cache_creation_tokens} "
+            f"cache_hit={usage.cache_hit} max_tokens={max_tokens} response_time={response_time_sec:.2f}s"
+        )
+
+        stop_reason = result["raw"].response_metadata.get("stop_reason")
+        if stop_reason == "max_tokens" and max_tokens < MAX_TOKENS_BUCKETS[-1]:
+            # Output was cut off, retry once with the largest budget
+            print(f"{stage}: output hit max_tokens={max_tokens}, retrying")
+            max_tokens = MAX_TOKENS_BUCKETS[-1]
+            continue
+        break
+
+    if result.get("parsing_error"):
+        raise result["parsing_error"]
+    if result.get("parsed") is None:
+        raise ValueError(f"{stage}: LLM returned no structured output")
+    return result["parsed"]
+
+
+async def process_stage_one(
+    text: str,
+    user_id: str = None,
+    additional_prompt: str = None,
+    usage_log: list[LlmCallUsage] = None,
+) -> LlmStageOutput:
+    """First stage of processing - extract structured data"""
+    try:
+        prompts = await get_compiled_prompts(user_id)
         
         # Add additional prompt if provided
+        suffix = None
         if additional_prompt:
-            system_message += f"\n\nAdditional Instructions: {additional_prompt}"
+            suffix = f"\n\nAdditional Instructions: {additional_prompt}"
+        system_message = build_system_message(prompts.stage_one_system_message, suffix)
         
         print("Starting stage 1 processing...")
-        response = await structured_llm.ainvoke(
-            [SystemMessage(content=system_message), HumanMessage(content=text)],
+        response = await invoke_structured_llm(
+            [system_message, HumanMessage(content=text)],
+            stage="stage_one",
+            user_id=user_id,
+            usage_log=usage_log,
         )
         print("Stage 1 output:", response)
         print("Stage 1 processing completed.")
@@ -83,56 +223,22 @@ async def process_stage_one(text: str, user_id: str = None, additional_prompt: s
 
 
 async def process_stage_two(
-    stage_one_output: LlmStageOutput, user_id: str = None
+    stage_one_output: LlmStageOutput,
+    user_id: str = None,
+    usage_log: list[LlmCallUsage] = None,
 ) -> LlmStageOutput:
     try:
-        # Try to use specific user's data if user_id provided
-        if user_id:
-            try:
-                prompts_data = await load_prompt_files(user_id)
-            except Exception:
-                # If user-specific data fails, fallback to superadmin or default
-                try:
-                    user_facade = DatabaseFacade(User)
-                    superadmin = await user_facade.get_one(is_superuser=True)
-                    if superadmin:
-                        prompts_data = await load_prompt_files(str(superadmin.id))
-                    else:
-                        prompts_data = load_default_prompt_files_data()
-                except Exception:
-                    prompts_data = load_default_prompt_files_data()
-        else:
-            # Fallback behavior when no user_id provided
-            try:
-                user_facade = DatabaseFacade(User)
-                superadmin = await user_facade.get_one(is_superuser=True)
-                if superadmin:
-                    prompts_data = await load_prompt_files(str(superadmin.id))
-                else:
-                    prompts_data = load_default_prompt_files_data()
-            except Exception:
-                # Fallback to default data if MongoDB is not available
-                prompts_data = load_default_prompt_files_data()
+        prompts = await get_compiled_prompts(user_id)
 
         print("Starting stage 2 processing...")
-        system_message = f"""
-        # Role
-        You are a doctor assistant who checks if final report is correct up to important notes
-        
-        # Goal 
-        Below is generated final report for my patient
-        Your task is check if final report is correct up to important notes
-        Return JSON with fixed fields. If nothing to fix, return as it is. Do not write anything else.
-        Note: patient letter must not have any other fields content, only letter content
-        
-        # Important notes 
-        {json.dumps(prompts_data['important_notes'])}
-        """
-        response = await structured_llm.ainvoke(
+        response = await invoke_structured_llm(
             [
-                SystemMessage(content=system_message),
+                build_system_message(prompts.stage_two_system_message),
                 HumanMessage(content=stage_one_output.model_dump_json()),
-            ]
+            ],
+            stage="stage_two",
+            user_id=user_id,
+            usage_log=usage_log,
         )
         print("Stage 2 output:", response)
         print("Stage 2 processing completed.")
@@ -143,20 +249,197 @@ async def process_stage_two(
         raise
 
 
-async def process_single_text(text: str, user_id: str = None, additional_prompt: str = None,) -> LlmStageOutput:
+def build_result_cache_key(
+    text: str, user_id: str, prompt_version: str, additional_prompt: str = None
+) -> str:
+    """Hash normalized input text together with everything that affects LLM output"""
+    normalized_text = " ".join(text.split())
+    normalized_additional_prompt = " ".join((additional_prompt or "").split())
+    key_source = "\0".join(
+        [user_id or "", prompt_version, normalized_additional_prompt, normalized_text]
+    )
+    return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+
+async def get_cached_result(cache_key: str) -> LlmStageOutput | None:
+    """Get memoized LLM result, ignoring cache errors"""
+    try:
+        result_cache_facade = DatabaseFacade(LlmResultCache)
+        cached = await result_cache_facade.get_one(cache_key=cache_key)
+        if cached:
+            return LlmStageOutput(**cached.processing_result)
+    except Exception as e:
+        print(f"Error reading result cache: {str(e)}")
+    return None
+
+
+async def store_cached_result(cache_key: str, user_id: str, result: LlmStageOutput):
+    """Memoize LLM result, ignoring cache errors"""
+    try:
+        result_cache_facade = DatabaseFacade(LlmResultCache)
+        await result_cache_facade.create(
+            cache_key=cache_key,
+            user_id=user_id or "",
+            processing_result=result.model_dump(),
+        )
+    except ValueError:
+        # Concurrent request already stored the same result
+        pass
+    except Exception as e:
+        print(f"Error writing result cache: {str(e)}")
+
+
+async def process_single_text(
+    text: str,
+    user_id: str = None,
+    additional_prompt: str = None,
+    on_progress: ProgressCallback = None,
+    usage_log: list[LlmCallUsage] = None,
+) -> LlmStageOutput:
     """Process a single text and return LlmStageOutput"""
+    prompts = await get_compiled_prompts(user_id)
+    cache_key = build_result_cache_key(text, user_id, prompts.version, additional_prompt)
+    cached_result = await get_cached_result(cache_key)
+    if cached_result:
+        print("Returning memoized LLM result")
+        return cached_result
+
     # Stage 1 & 2 processing
-    stage_one_result = await process_stage_one(text, user_id, additional_prompt)
-    final_llm_res = await process_stage_two(stage_one_result, user_id)
+    if on_progress:
+        await on_progress("stage_one", {})
+    stage_one_result = await process_stage_one(
+        text, user_id, additional_prompt, usage_log=usage_log
+    )
+    if on_progress:
+        await on_progress("stage_two", {})
+    final_llm_res = await process_stage_two(
+        stage_one_result, user_id, usage_log=usage_log
+    )
     final_llm_res_dict = final_llm_res.model_dump()
     for key, value in final_llm_res_dict.items():
         if value is None:
             final_llm_res_dict[key] = "_"
-    return LlmStageOutput(**final_llm_res_dict)
+    result = LlmStageOutput(**final_llm_res_dict)
+
+    await store_cached_result(cache_key, user_id, result)
+    return result
+
+
+async def transcribe_single_audio(
+    audio_path: str,
+    user_id: str,
+    on_progress: ProgressCallback = None,
+    timings: dict = None,
+) -> str:
+    """Transcribe a single audio file and return the transcribed text.
+
+    Recordings transcribed before (e.g. reprocessed as dictation) are served from
+    the transcript cache without running ffmpeg or Whisper. With timings, the
+    seconds spent queued behind other transcriptions and spent transcribing are
+    stored as transcription_wait_sec and transcription_wall_time_sec.
+    """
+    transcript_cache = TranscriptCache(user_id)
+    audio_hash = await asyncio.to_thread(hash_audio_file, audio_path)
+    cached_text = await transcript_cache.get("audio", audio_hash)
+    if cached_text is not None:
+        print(f"Transcript cache hit for audio {audio_hash[:12]}")
+        if on_progress:
+            await on_progress("transcribe", {"cached": True})
+        return cached_text
+
+    wait_start_time = time.perf_counter()
+    async with transcription_semaphore:
+        start_time = time.perf_counter()
+        transcription = await transcribe_audio_file(
+            audio_path, on_progress=on_progress, transcript_cache=transcript_cache
+        )
+        if timings is not None:
+            timings["transcription_wait_sec"] = start_time - wait_start_time
+            timings["transcription_wall_time_sec"] = time.perf_counter() - start_time
+    # Partial transcripts aren't cached, so reprocessing retries the missing chunks
+    if not transcription.is_partial:
+        await transcript_cache.put("audio", audio_hash, transcription.text)
+    print(f"Transcribed text: {transcription.text}")
+    return transcription.text
+
+
+def get_additional_prompt(processing_type: str) -> Optional[str]:
+    """Determine additional prompt based on processing type"""
+    if processing_type != "dictation":
+        return None
+    return f"""
+                    "You must keep everything that is dictated exactly as spoken in the letter content, preserving every word. 
+                    However, when explicit field instructions are dictated (that can belong to these fields: {LlmStageOutput.model_fields.keys()}), extract that information to the appropriate field AND remove the explicit field instruction from the letter body. 
+                    The letter should flow naturally without showing the dictated field labels."
+                    """
+
+
+async def process_and_save_text(
+    text: str,
+    user_id: str,
+    source_type: str,
+    filename: str = None,
+    additional_prompt: str = None,
+    on_progress: ProgressCallback = None,
+    transcription_wall_time_sec: float = None,
+    transcription_wait_sec: float = None,
+    include_source_type: bool = True,
+    job_id: str = None,
+) -> dict:
+    """Process text with LLM and save result to TranscriptionProcessingResult.
+
+    include_source_type adds source_type to the result, as documents and audio
+    results always had it. With job_id, at most one result is saved per job.
+    """
+    usage_log = []
+    result = await process_single_text(
+        text,
+        user_id,
+        additional_prompt=additional_prompt,
+        on_progress=on_progress,
+        usage_log=usage_log,
+    )
+    result_dict = result.model_dump()
+    if include_source_type:
+        result_dict["source_type"] = source_type
+
+    usage = summarize_usage(usage_log)
+    if transcription_wall_time_sec is not None:
+        usage["transcription_wall_time_sec"] = transcription_wall_time_sec
+    if transcription_wait_sec is not None:
+        usage["transcription_wait_sec"] = transcription_wait_sec
+
+    transcription_facade = DatabaseFacade(TranscriptionProcessingResult)
+    await transcription_facade.create(
+        user_id=user_id,
+        source_type=source_type,
+        source_text=text,
+        processing_result=result_dict,
+        usage=usage,
+        job_id=job_id,
+    )
+
+    if filename:
+        result_dict["source_filename"] = filename
+    return result_dict
+
 
+async def transcribe_process_and_save_audio(
+    audio_path: str, filename: str, user_id: str, processing_type: str
+) -> dict:
+    """Transcribe single audio file, process transcription with LLM and save result"""
+    timings = {}
+    transcribed_text = await transcribe_single_audio(
+        audio_path, user_id, timings=timings
+    )
 
-async def transcribe_single_audio(audio_bytes: bytes, filename: str) -> str:
-    """Transcribe a single audio file and return the transcribed text"""
-    transcribed_text = await transcribe_audio_with_openai(audio_bytes, filename)
-    print(f"Transcribed text: {transcribed_text}")
-    return transcribed_text
+    source_type = "audio_dictation" if processing_type == "dictation" else "audio"
+    return await process_and_save_text(
+        transcribed_text,
+        user_id,
+        source_type=source_type,
+        filename=filename,
+        additional_prompt=get_additional_prompt(processing_type),
+        transcription_wall_time_sec=timings.get("transcription_wall_time_sec"),
+        transcription_wait_sec=timings.get("transcription_wait_sec"),
+    )
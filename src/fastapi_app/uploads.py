@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import os
+import time
+import weakref
+from typing import AsyncIterator, Awaitable, Callable
+
+from fastapi import UploadFile
+
+from src.common.settings import settings
+from src.common.models import AudioUploadSession
+from src.common.db_facade import DatabaseFacade
+from src.utils.audio_spool import SpoolBudget, audio_spool
+from src.utils.consts import AUDIO_UPLOADS_FILES_DIR
+from src.utils.utils import cleanup_temp_file
+
+
+async def copy_upload_to_file(file: UploadFile, path: str):
+    """Copy upload to path in fixed-size blocks, so it's never fully held in memory"""
+    block_size = settings.AUDIO_UPLOAD_BLOCK_KB * 1024
+    await file.seek(0)
+    with open(path, "wb") as out_file:
+        while block := await file.read(block_size):
+            await asyncio.to_thread(out_file.write, block)
+
+
+def new_request_spool_budget() -> SpoolBudget:
+    return SpoolBudget(max_bytes=settings.AUDIO_REQUEST_SPOOL_MAX_MB * 1024 * 1024)
+
+
+class SpooledUploadPipeline:
+    """Spools one upload and runs process on the spooled file in a background task.
+
+    Processing starts as soon as this file is spooled, while later files of the same
+    request are still being copied. spooled is set once the upload is no longer
+    read, so the handler can return while processing continues.
+    """
+
+    def __init__(
+        self,
+        file: UploadFile,
+        budget: SpoolBudget,
+        process: Callable[[str], Awaitable[dict]],
+    ):
+        self.filename = file.filename
+        self.spooled = asyncio.Event()
+        self.task = asyncio.create_task(self._run(file, budget, process))
+
+    async def _run(
+        self,
+        file: UploadFile,
+        budget: SpoolBudget,
+        process: Callable[[str], Awaitable[dict]],
+    ) -> dict:
+        file_ext = os.path.splitext(file.filename)[1] or ".mp3"
+        try:
+            with audio_spool.reserve(file_ext, file.size, budget) as audio_path:
+                await copy_upload_to_file(file, audio_path)
+                self.spooled.set()
+                return await process(audio_path)
+        finally:
+            self.spooled.set()
+
+
+def start_upload_pipelines(
+    files: list[UploadFile], process: Callable[[str, str], Awaitable[dict]]
+) -> list[SpooledUploadPipeline]:
+    """Start a spooled pipeline per upload, process gets spooled path and filename"""
+    budget = new_request_spool_budget()
+    return [
+        SpooledUploadPipeline(
+            file,
+            budget,
+            lambda audio_path, filename=file.filename: process(audio_path, filename),
+        )
+        for file in files
+    ]
+
+
+async def wait_until_spooled(pipelines: list[SpooledUploadPipeline]):
+    """Wait until all uploads are copied out of the request"""
+    await asyncio.gather(*[pipeline.spooled.wait() for pipeline in pipelines])
+
+
+# Serializes requests for the same resumable upload session within this process.
+# A lock lives only while a request holds or waits for it.
+upload_session_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = (
+    weakref.WeakValueDictionary()
+)
+
+
+def get_upload_session_lock(upload_id: str) -> asyncio.Lock:
+    """Lock of an upload session, call only after the session was found for the user"""
+    lock = upload_session_locks.get(upload_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        upload_session_locks[upload_id] = lock
+    return lock
+
+
+def _open_at_offset(path: str, offset: int):
+    audio_file = open(path, "r+b" if os.path.exists(path) else "wb")
+    # Drop bytes of an earlier attempt of this part that didn't complete
+    audio_file.truncate(offset)
+    audio_file.seek(offset)
+    return audio_file
+
+
+async def write_upload_part(
+    path: str, offset: int, body: AsyncIterator[bytes], max_bytes: int
+) -> tuple[int, str]:
+    """Write streamed part at offset and return its size and sha256.
+
+    Raises ValueError when the part is larger than max_bytes.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    audio_file = await asyncio.to_thread(_open_at_offset, path, offset)
+    try:
+        async for block in body:
+            size += len(block)
+            if size > max_bytes:
+                raise ValueError(f"Part is larger than {max_bytes} bytes")
+            digest.update(block)
+            await asyncio.to_thread(audio_file.write, block)
+    finally:
+        await asyncio.to_thread(audio_file.close)
+    return size, digest.hexdigest()
+
+
+def truncate_upload_file(path: str, size: int):
+    with open(path, "r+b") as audio_file:
+        audio_file.truncate(size)
+
+
+async def cleanup_stale_upload_files():
+    """Remove files of resumable uploads whose session expired or was finalized"""
+    os.makedirs(AUDIO_UPLOADS_FILES_DIR, exist_ok=True)
+    # Files written after sessions are listed may belong to a session created since
+    listed_at = time.time()
+    session_facade = DatabaseFacade(AudioUploadSession)
+    sessions = await session_facade.get_many(filters={"status": "uploading"})
+    active_paths = {os.path.abspath(session.audio_path) for session in sessions}
+
+    removed = 0
+    for filename in os.listdir(AUDIO_UPLOADS_FILES_DIR):
+        path = os.path.abspath(os.path.join(AUDIO_UPLOADS_FILES_DIR, filename))
+        if path in active_paths:
+            continue
+        try:
+            if os.path.getmtime(path) >= listed_at:
+                continue
+        except FileNotFoundError:
+            # Moved by a finalize that ran meanwhile
+            continue
+        cleanup_temp_file(path)
+        removed += 1
+    if removed:
+        print(f"Removed {removed} stale resumable upload files")
@@ -0,0 +1,276 @@
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+
+@dataclass
+class AudioChunk:
+    start: float
+    end: float
+    # Seconds at the start of this chunk that were also sent with the previous one
+    overlap_before: float = 0.0
+    path: Optional[str] = None
+    # Container extension of the extracted chunk, e.g. "ogg"
+    ext: Optional[str] = None
+    # Encoded chunk when it is kept in memory instead of written to path
+    data: Optional[bytes] = None
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+SILENCE_START_RE = re.compile(r"silence_start: (-?\d+(?:\.\d+)?)")
+SILENCE_END_RE = re.compile(r"silence_end: (-?\d+(?:\.\d+)?)")
+
+
+def parse_silences(
+    silencedetect_log: str, duration: float
+) -> list[tuple[float, float]]:
+    """Parse (start, end) silence spans from ffmpeg silencedetect stderr output"""
+    silences = []
+    silence_start = None
+    for line in silencedetect_log.splitlines():
+        start_match = SILENCE_START_RE.search(line)
+        if start_match:
+            silence_start = max(float(start_match.group(1)), 0.0)
+            continue
+        end_match = SILENCE_END_RE.search(line)
+        if end_match and silence_start is not None:
+            silences.append((silence_start, float(end_match.group(1))))
+            silence_start = None
+
+    # Silence that runs until the end of file has no silence_end line
+    if silence_start is not None:
+        silences.append((silence_start, duration))
+    return silences
+
+
+def plan_chunks(
+    duration: float,
+    silences: list[tuple[float, float]],
+    target_sec: float,
+    search_window_sec: float,
+    overlap_sec: float,
+) -> list[AudioChunk]:
+    """Plan chunks of about target_sec cut in the middle of the nearest silence.
+
+    When there is no silence within search_window_sec of the target, the chunk is
+    cut hard and the next chunk starts overlap_sec earlier so no word is lost.
+    """
+    chunks = []
+    chunk_start = 0.0
+    overlap_before = 0.0
+
+    while duration - chunk_start > target_sec + search_window_sec:
+        ideal_cut = chunk_start + target_sec
+        candidates = [
+            (silence_start + silence_end) / 2
+            for silence_start, silence_end in silences
+            if abs((silence_start + silence_end) / 2 - ideal_cut) <= search_window_sec
+        ]
+
+        if candidates:
+            cut = min(candidates, key=lambda midpoint: abs(midpoint - ideal_cut))
+            next_overlap = 0.0
+        else:
+            cut = ideal_cut
+            next_overlap = overlap_sec
+
+        chunks.append(
+            AudioChunk(
+                start=max(chunk_start - overlap_before, 0.0),
+                end=cut,
+                overlap_before=overlap_before,
+            )
+        )
+        chunk_start = cut
+        overlap_before = next_overlap
+
+    chunks.append(
+        AudioChunk(
+            start=max(chunk_start - overlap_before, 0.0),
+            end=duration,
+            overlap_before=overlap_before,
+        )
+    )
+    return chunks
+
+
+def choose_live_cut(
+    available_sec: float,
+    silences: list[tuple[float, float]],
+    min_sec: float,
+    max_sec: float,
+    tail_sec: float = 1.0,
+) -> Optional[float]:
+    """Pick where to end the next segment of a recording that is still growing.
+
+    Cuts in the latest silence after min_sec that leaves tail_sec of audio,
+    since the last received word may be incomplete. Falls back to a hard cut
+    once max_sec of audio is waiting, returns None to wait for more audio.
+    """
+    candidates = [
+        (silence_start + silence_end) / 2
+        for silence_start, silence_end in silences
+        if min_sec <= (silence_start + silence_end) / 2 <= available_sec - tail_sec
+    ]
+    if candidates:
+        return max(candidates)
+    if available_sec >= max_sec:
+        return available_sec - tail_sec
+    return None
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w]", "", word.lower())
+
+
+def stitch_overlap(
+    previous: str, current: str, max_words: int = 30, max_skip: int = 5
+) -> str:
+    """Drop words at the start of current that repeat the end of previous.
+
+    The repeated run may start a few words into current, since the first word
+    of an overlapping chunk is often a fragment of a cut word.
+    """
+    previous_words = [_normalize_word(word) for word in previous.split()[-max_words:]]
+    current_words = current.split()
+    normalized_current = [
+        _normalize_word(word) for word in current_words[: max_words + max_skip]
+    ]
+
+    for length in range(min(len(previous_words), len(normalized_current)), 1, -1):
+        previous_tail = previous_words[-length:]
+        for skip in range(0, min(max_skip, len(normalized_current) - length) + 1):
+            if normalized_current[skip : skip + length] == previous_tail:
+                return " ".join(current_words[skip + length :])
+    return current
+
+
+@dataclass
+class Transcription:
+    text: str
+    # (start, end) seconds of the original recording missing from text
+    gaps: list[tuple[float, float]] = field(default_factory=list)
+
+    @property
+    def is_partial(self) -> bool:
+        return bool(self.gaps)
+
+
+def format_timestamp(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def format_gap(start: float, end: float) -> str:
+    """Marker put into the transcript where audio could not be transcribed"""
+    return f"[transcription missing {format_timestamp(start)}-{format_timestamp(end)}]"
+
+
+def join_transcriptions(
+    transcriptions: list[Optional[str]],
+    chunks: list[AudioChunk],
+    to_original_time: Callable[[float], float] = None,
+) -> Transcription:
+    """Join chunk transcriptions, de-duplicating text from overlapping chunks.
+
+    Chunks without a transcription (None) are marked as gaps. to_original_time
+    maps chunk times to the original recording when silences were trimmed.
+    """
+    to_original_time = to_original_time or (lambda time: time)
+    joined = []
+    gaps = []
+    previous_failed = False
+    for transcription, chunk in zip(transcriptions, chunks):
+        if transcription is None:
+            gap = (to_original_time(chunk.start), to_original_time(chunk.end))
+            if previous_failed:
+                # Merge consecutive failed chunks into one gap
+                gap = (gaps.pop()[0], gap[1])
+                joined.pop()
+            gaps.append(gap)
+            joined.append(format_gap(*gap))
+            previous_failed = True
+            continue
+
+        text = transcription.strip()
+        if joined and chunk.overlap_before > 0 and not previous_failed:
+            text = stitch_overlap(joined[-1], text)
+        if text:
+            joined.append(text)
+        previous_failed = False
+    return Transcription(text=" ".join(joined), gaps=gaps)
+
+
+@dataclass
+class TrimmedSegment:
+    original_start: float
+    trimmed_start: float
+    duration: float
+
+
+@dataclass
+class SilenceTrim:
+    path: str
+    original_duration: float
+    # Maps positions in the trimmed audio back to the original recording
+    segments: list[TrimmedSegment]
+
+    @property
+    def trimmed_duration(self) -> float:
+        return sum(segment.duration for segment in self.segments)
+
+    @property
+    def dropped_sec(self) -> float:
+        return self.original_duration - self.trimmed_duration
+
+    def to_original_time(self, trimmed_time: float) -> float:
+        """Convert timestamp in trimmed audio to timestamp in original recording"""
+        for segment in self.segments:
+            if trimmed_time <= segment.trimmed_start + segment.duration:
+                offset = max(trimmed_time - segment.trimmed_start, 0.0)
+                return segment.original_start + offset
+        return self.original_duration
+
+
+def plan_speech_segments(
+    duration: float,
+    silences: list[tuple[float, float]],
+    min_silence_sec: float,
+    padding_sec: float,
+) -> list[tuple[float, float]]:
+    """Get (start, end) spans to keep, removing silences longer than min_silence_sec.
+
+    padding_sec of each removed silence is kept on both sides so speech isn't clipped.
+    """
+    keep = []
+    position = 0.0
+    for silence_start, silence_end in silences:
+        if silence_end - silence_start < min_silence_sec:
+            continue
+        drop_start = silence_start + padding_sec
+        drop_end = silence_end - padding_sec
+        if drop_end <= drop_start:
+            continue
+        if drop_start > position:
+            keep.append((position, drop_start))
+        position = drop_end
+
+    if position < duration:
+        keep.append((position, duration))
+    return keep
+
+
+def build_trimmed_segments(keep: list[tuple[float, float]]) -> list[TrimmedSegment]:
+    segments = []
+    trimmed_start = 0.0
+    for start, end in keep:
+        segments.append(
+            TrimmedSegment(
+                original_start=start, trimmed_start=trimmed_start, duration=end - start
+            )
+        )
+        trimmed_start += end - start
+    return segments
@@ -0,0 +1,59 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from src.common.settings import settings
+
+
+@dataclass(frozen=True)
+class TranscodeProfile:
+    name: str
+    ext: Optional[str]
+    codec_args: Optional[tuple[str, ...]]
+
+    @property
+    def is_stream_copy(self) -> bool:
+        return self.codec_args is None
+
+
+# Whisper resamples everything to 16 kHz mono, so anything above that is wasted upload
+TRANSCODE_PROFILES = {
+    # Keep original audio, stream copy when possible (largest uploads)
+    "copy": TranscodeProfile(name="copy", ext=None, codec_args=None),
+    "mp3_stereo_192k": TranscodeProfile(
+        name="mp3_stereo_192k",
+        ext="mp3",
+        codec_args=("-c:a", "libmp3lame", "-ar", "44100", "-ac", "2", "-b:a", "192k"),
+    ),
+    "mp3_mono_16k": TranscodeProfile(
+        name="mp3_mono_16k",
+        ext="mp3",
+        codec_args=("-c:a", "libmp3lame", "-ar", "16000", "-ac", "1", "-b:a", "32k"),
+    ),
+    "opus_mono_16k": TranscodeProfile(
+        name="opus_mono_16k",
+        ext="ogg",
+        codec_args=(
+            "-c:a",
+            "libopus",
+            "-ar",
+            "16000",
+            "-ac",
+            "1",
+            "-b:a",
+            "24k",
+            "-application",
+            "voip",
+        ),
+    ),
+}
+
+
+def get_transcode_profile(name: str = None) -> TranscodeProfile:
+    """Get transcoding profile by name, defaults to WHISPER_TRANSCODE_PROFILE setting"""
+    name = name or settings.WHISPER_TRANSCODE_PROFILE
+    if name not in TRANSCODE_PROFILES:
+        raise ValueError(
+            f"Unknown transcode profile '{name}', "
+            f"expected one of: {', '.join(TRANSCODE_PROFILES)}"
+        )
+    return TRANSCODE_PROFILES[name]
@@ -0,0 +1,86 @@
+import os
+import uuid
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
+
+from src.common.settings import settings
+
+
+@dataclass
+class SpoolBudget:
+    """Share of the spool one request may use, so a single request can't fill it"""
+
+    max_bytes: int
+    used_bytes: int = 0
+
+    def fits(self, size_bytes: int) -> bool:
+        return self.used_bytes + size_bytes <= self.max_bytes
+
+
+class AudioSpool:
+    """Scratch space for audio files that ffmpeg needs to seek in.
+
+    Files go to a tmpfs directory while the total reserved size stays under
+    max_bytes, otherwise to the regular temp directory on disk. Files are
+    always removed when the reservation is released.
+    """
+
+    def __init__(
+        self, directory: str, max_bytes: int, fallback_directory: str = "temp"
+    ):
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._fallback_directory = fallback_directory
+        self._used_bytes = 0
+        self._directory_ready = None
+
+    def _spool_available(self) -> bool:
+        if self._directory_ready is None:
+            try:
+                os.makedirs(self._directory, exist_ok=True)
+                self._directory_ready = True
+            except OSError as e:
+                print(f"Warning: audio spool {self._directory} unavailable: {str(e)}")
+                self._directory_ready = False
+        return self._directory_ready
+
+    @property
+    def used_bytes(self) -> int:
+        return self._used_bytes
+
+    @contextmanager
+    def reserve(self, suffix: str, size_bytes: int | None, budget: SpoolBudget = None):
+        """Reserve a scratch file path for up to size_bytes and remove the file on exit.
+
+        Files of unknown size, or that don't fit the optional per-request budget,
+        go to disk.
+        """
+        use_spool = (
+            size_bytes is not None
+            and self._spool_available()
+            and self._used_bytes + size_bytes <= self._max_bytes
+            and (budget is None or budget.fits(size_bytes))
+        )
+        directory = self._directory if use_spool else self._fallback_directory
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{uuid.uuid4().hex}{suffix}")
+
+        if use_spool:
+            self._used_bytes += size_bytes
+            if budget:
+                budget.used_bytes += size_bytes
+        try:
+            yield path
+        finally:
+            if use_spool:
+                self._used_bytes -= size_bytes
+                if budget:
+                    budget.used_bytes -= size_bytes
+            with suppress(FileNotFoundError):
+                os.unlink(path)
+
+
+audio_spool = AudioSpool(
+    directory=settings.AUDIO_SPOOL_DIR,
+    max_bytes=settings.AUDIO_SPOOL_MAX_MB * 1024 * 1024,
+)
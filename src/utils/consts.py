@@ -1,3 +1,5 @@
 LLM_OUTPUT_REPORT_CONTENT_PARAGRAPH_BLOCK = '<p style="text-align:justify; font-size:10pt"><span style="font-family:Arial">{paragraph}</span></p>'
 USER_FILES_DIR = "user_files"
 USER_REPORTS_FILES_DIR = USER_FILES_DIR + "reports"
+AUDIO_JOBS_FILES_DIR = USER_FILES_DIR + "/audio_jobs"
+AUDIO_UPLOADS_FILES_DIR = USER_FILES_DIR + "/audio_uploads"
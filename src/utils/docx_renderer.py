@@ -0,0 +1,174 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from src.common.settings import settings
+from src.utils.docx_template import DocxTemplateCache
+
+# Compiled templates of one renderer worker process
+_worker_template_cache: DocxTemplateCache | None = None
+
+
+def _init_docx_worker(template_cache_size: int):
+    global _worker_template_cache
+    _worker_template_cache = DocxTemplateCache(max_size=template_cache_size)
+
+
+def _render_in_worker(template_path: str, values: dict) -> bytes:
+    return _worker_template_cache.get(template_path).render(values, html=True)
+
+
+class DocxRenderPool:
+    """Renders DOCX reports in worker processes, off the event loop.
+
+    Filling templates, converting HTML values and zipping the document are CPU
+    bound. Every worker keeps its own cache of compiled templates. At most
+    `workers` renders are in flight, the rest wait in queue_depth. A render
+    slower than timeout_sec raises TimeoutError and its workers are killed, so
+    a hung render can't hold a slot. Renders in flight on the same workers fail
+    with BrokenProcessPool. Workers are started on first use.
+    """
+
+    def __init__(self, workers: int, timeout_sec: float, template_cache_size: int):
+        self._workers = workers
+        self._timeout_sec = timeout_sec
+        self._template_cache_size = template_cache_size
+        self._executor = None
+        self._slots = asyncio.Semaphore(workers)
+
+        # Metrics
+        self._queued = 0
+        self._admitted = 0
+        self._active = 0
+        self._max_queue_depth = 0
+        self._rendered = 0
+        self._failed = 0
+        self._timed_out = 0
+        self._total_render_sec = 0.0
+        self._max_render_sec = 0.0
+        self._total_wait_sec = 0.0
+        self._max_wait_sec = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                # Forking a process with a running event loop and open sockets is unsafe
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_docx_worker,
+                initargs=(self._template_cache_size,),
+            )
+        return self._executor
+
+    def _finish(
+        self,
+        future: asyncio.Future,
+        executor: ProcessPoolExecutor,
+        started_at: float,
+    ):
+        """Release the slot once the worker is done or the render was cancelled"""
+        self._active -= 1
+        self._slots.release()
+        if future.cancelled() or future.exception() is not None:
+            self._failed += 1
+            if (
+                not future.cancelled()
+                and isinstance(future.exception(), BrokenProcessPool)
+                and executor is self._executor
+            ):
+                # A worker died, start a fresh pool for the next render
+                self.shutdown()
+            return
+
+        render_sec = time.monotonic() - started_at
+        self._rendered += 1
+        self._total_render_sec += render_sec
+        self._max_render_sec = max(self._max_render_sec, render_sec)
+
+    async def render(self, template_path: str, values: dict) -> bytes:
+        """Fill template at template_path with values and return the DOCX content"""
+        enqueued_at = time.monotonic()
+        self._queued += 1
+        self._max_queue_depth = max(self._max_queue_depth, self._queued)
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+
+        started_at = time.monotonic()
+        wait_sec = started_at - enqueued_at
+        self._admitted += 1
+        self._total_wait_sec += wait_sec
+        self._max_wait_sec = max(self._max_wait_sec, wait_sec)
+
+        self._active += 1
+        try:
+            executor = self._get_executor()
+            future = asyncio.get_running_loop().run_in_executor(
+                executor, _render_in_worker, template_path, values
+            )
+        except BaseException:
+            self._active -= 1
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda done: self._finish(done, executor, started_at))
+
+        try:
+            # Shielded, so a timeout or a disconnected client doesn't cancel the
+            # future and release the slot while the worker is still rendering
+            return await asyncio.wait_for(asyncio.shield(future), self._timeout_sec)
+        except TimeoutError:
+            self._timed_out += 1
+            # The worker may never return, recycle the pool and free the slot now
+            self._recycle(executor)
+            future.cancel()
+            raise TimeoutError(
+                f"DOCX rendering took longer than {self._timeout_sec} seconds"
+            )
+
+    def snapshot(self) -> dict:
+        return {
+            "workers": self._workers,
+            "active": self._active,
+            "queue_depth": self._queued,
+            "max_queue_depth": self._max_queue_depth,
+            "rendered": self._rendered,
+            "failed": self._failed,
+            "timed_out": self._timed_out,
+            "avg_render_sec": (
+                self._total_render_sec / self._rendered if self._rendered else 0.0
+            ),
+            "max_render_sec": self._max_render_sec,
+            "avg_wait_sec": (
+                self._total_wait_sec / self._admitted if self._admitted else 0.0
+            ),
+            "max_wait_sec": self._max_wait_sec,
+        }
+
+    def _recycle(self, executor: ProcessPoolExecutor):
+        """Stop executor and kill its workers, the next render starts a fresh pool"""
+        # shutdown() drops the executor's reference to its processes
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        if executor is self._executor:
+            self._executor = None
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+docx_render_pool = DocxRenderPool(
+    workers=settings.DOCX_RENDER_WORKERS,
+    timeout_sec=settings.DOCX_RENDER_TIMEOUT_SEC,
+    template_cache_size=settings.DOCX_TEMPLATE_CACHE_SIZE,
+)
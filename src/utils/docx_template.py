@@ -0,0 +1,177 @@
+import copy
+import os
+import re
+from io import BytesIO
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from docx import Document
+from docx.document import Document as DocumentObject
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+from docx.text.run import Run
+
+from src.utils.local_docx_formatter import LocalDocxFormatter
+
+PLACEHOLDER_RE = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+@dataclass
+class PlaceholderRun:
+    # Child indexes from document body down to the paragraph holding the run
+    paragraph_path: tuple[int, ...]
+    run_index: int
+    # Run text split into literal text and placeholder names, e.g.
+    # [("text", "Dear "), ("field", "recipient_name")]
+    tokens: list[tuple[str, str]]
+
+
+def tokenize_placeholders(text: str) -> list[tuple[str, str]]:
+    tokens = []
+    position = 0
+    for match in PLACEHOLDER_RE.finditer(text):
+        if match.start() > position:
+            tokens.append(("text", text[position : match.start()]))
+        tokens.append(("field", match.group(1)))
+        position = match.end()
+    if position < len(text):
+        tokens.append(("text", text[position:]))
+    return tokens
+
+
+class DocxTemplate:
+    """Parsed DOCX template with the location of every {placeholder} run.
+
+    Templates are parsed and scanned once. fill works on a deep copy of the
+    parsed tree and visits only the runs that hold placeholders. Like
+    LocalDocxFormatter.replace_all, a placeholder has to be inside one run.
+    """
+
+    def __init__(self, document: DocumentObject):
+        self._document = document
+        self.placeholder_runs = self._index_placeholders(document)
+
+    @classmethod
+    def load(cls, template_path: str) -> "DocxTemplate":
+        return cls(Document(template_path))
+
+    @staticmethod
+    def _index_placeholders(document: DocumentObject) -> list[PlaceholderRun]:
+        placeholder_runs = []
+
+        def visit(element, path: tuple[int, ...]):
+            for index, child in enumerate(element):
+                child_path = path + (index,)
+                if child.tag == qn("w:p"):
+                    for run_index, run_element in enumerate(child):
+                        if run_element.tag != qn("w:r"):
+                            continue
+                        text = Run(run_element, None).text
+                        if PLACEHOLDER_RE.search(text):
+                            placeholder_runs.append(
+                                PlaceholderRun(
+                                    paragraph_path=child_path,
+                                    run_index=run_index,
+                                    tokens=tokenize_placeholders(text),
+                                )
+                            )
+                else:
+                    # Tables, cells and content controls can contain paragraphs
+                    visit(child, child_path)
+
+        visit(document.element.body, ())
+        return placeholder_runs
+
+    @property
+    def fields(self) -> set[str]:
+        return {
+            value
+            for placeholder_run in self.placeholder_runs
+            for kind, value in placeholder_run.tokens
+            if kind == "field"
+        }
+
+    def fill(
+        self,
+        values: dict,
+        html: bool = True,
+        formatter: LocalDocxFormatter = None,
+    ) -> DocumentObject:
+        """Return a new document with placeholders replaced by values.
+
+        Placeholders without a value (missing or None) are left as they are.
+        With html, values are converted to formatted runs.
+        """
+        formatter = formatter or LocalDocxFormatter()
+        document = copy.deepcopy(self._document)
+        body = document.element.body
+
+        # Resolve all runs before editing, inserted runs shift sibling indexes
+        targets = []
+        for placeholder_run in self.placeholder_runs:
+            paragraph_element = body
+            for index in placeholder_run.paragraph_path:
+                paragraph_element = paragraph_element[index]
+            targets.append(
+                (
+                    Paragraph(paragraph_element, document._body),
+                    paragraph_element[placeholder_run.run_index],
+                    placeholder_run.tokens,
+                )
+            )
+
+        for paragraph, run_element, tokens in targets:
+            for kind, value in tokens:
+                field_value = values.get(value) if kind == "field" else None
+                if field_value is None:
+                    # Literal text or unfilled placeholder keeps the run formatting
+                    text = value if kind == "text" else "{" + value + "}"
+                    new_run_element = copy.deepcopy(run_element)
+                    Run(new_run_element, paragraph).text = text
+                    run_element.addprevious(new_run_element)
+                elif html:
+                    runs_count = len(paragraph.runs)
+                    formatter.apply_html_formatting(paragraph, str(field_value))
+                    for new_run in paragraph.runs[runs_count:]:
+                        run_element.addprevious(new_run._element)
+                else:
+                    new_run_element = copy.deepcopy(run_element)
+                    Run(new_run_element, paragraph).text = str(field_value)
+                    run_element.addprevious(new_run_element)
+            paragraph_element = run_element.getparent()
+            paragraph_element.remove(run_element)
+
+        return document
+
+    def render(self, values: dict, html: bool = True) -> bytes:
+        """Fill template and return the DOCX file content, without touching disk"""
+        buffer = BytesIO()
+        self.fill(values, html=html).save(buffer)
+        return buffer.getvalue()
+
+
+class DocxTemplateCache:
+    """In-process LRU cache of compiled templates keyed by path and modification time.
+
+    Needs no invalidation, a re-uploaded template has a new modification time
+    and a deleted one fails on the getmtime check.
+    """
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, DocxTemplate]] = OrderedDict()
+
+    def get(self, template_path: str) -> DocxTemplate:
+        """Return compiled template, recompiling it when the file changed"""
+        mtime = os.path.getmtime(template_path)
+        entry = self._entries.get(template_path)
+        if entry and entry[0] == mtime:
+            self._entries.move_to_end(template_path)
+            return entry[1]
+
+        template = DocxTemplate.load(template_path)
+        self._entries[template_path] = (mtime, template)
+        self._entries.move_to_end(template_path)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+        return template
@@ -0,0 +1,137 @@
+import hashlib
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from html.parser import HTMLParser
+
+from src.common.settings import settings
+
+HEX_COLOR_RE = re.compile(r"#[0-9A-Fa-f]{6}")
+
+# Tags that never have content, so they're never pushed on the style stack
+VOID_TAGS = set(
+    "area base br col embed hr img input link meta param source track wbr".split()
+)
+
+
+@dataclass(frozen=True)
+class RunStyle:
+    bold: bool = False
+    italic: bool = False
+    underline: bool = False
+    # RRGGBB without the leading #
+    color: str | None = None
+
+
+@dataclass(frozen=True)
+class RunSpec:
+    """Text run, or a line break when text is None"""
+
+    text: str | None
+    style: RunStyle = RunStyle()
+
+    @property
+    def is_break(self) -> bool:
+        return self.text is None
+
+
+def _tag_style(
+    parent: RunStyle, tag: str, attrs: list[tuple[str, str | None]]
+) -> RunStyle:
+    if tag in ("b", "strong"):
+        return RunStyle(True, parent.italic, parent.underline, parent.color)
+    if tag in ("i", "em"):
+        return RunStyle(parent.bold, True, parent.underline, parent.color)
+    if tag == "u":
+        return RunStyle(parent.bold, parent.italic, True, parent.color)
+    if tag == "font":
+        color = dict(attrs).get("color") or ""
+        if HEX_COLOR_RE.fullmatch(color):
+            return RunStyle(
+                parent.bold, parent.italic, parent.underline, color[1:].upper()
+            )
+    return parent
+
+
+class _RunSpecParser(HTMLParser):
+    """Single pass over the HTML keeping the style of every open tag on a stack.
+
+    Text gets the style on top of the stack, so nesting depth doesn't matter.
+    Closing a tag that isn't the innermost one also closes the tags inside it,
+    like BeautifulSoup does.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.specs: list[RunSpec] = []
+        self._stack: list[tuple[str, RunStyle]] = []
+        self._text: list[str] = []
+
+    @property
+    def _style(self) -> RunStyle:
+        return self._stack[-1][1] if self._stack else RunStyle()
+
+    def _flush_text(self):
+        # A text node may arrive in several pieces, e.g. around a stray "<"
+        text = "".join(self._text)
+        self._text.clear()
+        if text.strip():
+            self.specs.append(RunSpec(text, self._style))
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if tag == "br":
+            self.specs.append(RunSpec(None))
+        elif tag not in VOID_TAGS:
+            self._stack.append((tag, _tag_style(self._style, tag, attrs)))
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush_text()
+        if tag == "br":
+            self.specs.append(RunSpec(None))
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                del self._stack[index:]
+                break
+
+    def handle_data(self, data):
+        self._text.append(data)
+
+    def close(self):
+        super().close()
+        self._flush_text()
+
+
+def parse_run_specs(html_text: str) -> tuple[RunSpec, ...]:
+    parser = _RunSpecParser()
+    parser.feed(html_text)
+    parser.close()
+    return tuple(parser.specs)
+
+
+class RunSpecCache:
+    """In-process LRU cache of converted HTML fragments keyed by content hash"""
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[RunSpec, ...]] = OrderedDict()
+
+    def get(self, html_text: str) -> tuple[RunSpec, ...]:
+        """Return run specs of html_text, parsing it only on first use"""
+        key = hashlib.blake2b(html_text.encode("utf-8"), digest_size=16).digest()
+        specs = self._entries.get(key)
+        if specs is not None:
+            self._entries.move_to_end(key)
+            return specs
+
+        specs = parse_run_specs(html_text)
+        self._entries[key] = specs
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+        return specs
+
+
+run_spec_cache = RunSpecCache(max_size=settings.DOCX_HTML_RUNS_CACHE_SIZE)
@@ -0,0 +1,179 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from src.common.settings import settings
+
+
+@dataclass
+class _Waiter:
+    user_id: str
+    estimated_tokens: int
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _TokenCharge:
+    charged_at: float
+    tokens: int
+
+
+class LlmScheduler:
+    """Admission control in front of LLM calls.
+
+    Limits concurrent calls and tokens per minute globally and serves waiting
+    users round-robin, so one large batch can't starve everyone else.
+    """
+
+    def __init__(self, max_concurrency: int, tokens_per_minute: int):
+        self._max_concurrency = max_concurrency
+        self._tokens_per_minute = tokens_per_minute
+        self._queues: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self._token_window: deque[_TokenCharge] = deque()
+        self._active = 0
+        self._retry_handle: asyncio.TimerHandle | None = None
+
+        # Metrics
+        self._admitted = 0
+        self._total_wait_sec = 0.0
+        self._max_wait_sec = 0.0
+        self._max_queue_depth = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _tokens_in_window(self) -> int:
+        window_start = time.monotonic() - 60
+        while self._token_window and self._token_window[0].charged_at < window_start:
+            self._token_window.popleft()
+        return sum(charge.tokens for charge in self._token_window)
+
+    def _seconds_until_budget(self, tokens: int) -> float:
+        """Seconds until enough old charges leave the window to fit tokens, 0 if it fits now"""
+        if not self._tokens_per_minute:
+            return 0.0
+
+        used = self._tokens_in_window()
+        # Always let a single oversized request through an empty window
+        if not self._token_window or used + tokens <= self._tokens_per_minute:
+            return 0.0
+
+        now = time.monotonic()
+        for charge in self._token_window:
+            used -= charge.tokens
+            if used + tokens <= self._tokens_per_minute:
+                return max(charge.charged_at + 60 - now, 0.01)
+        return 60.0
+
+    def _dispatch(self):
+        """Admit waiting calls round-robin across users while capacity allows"""
+        self._retry_handle = None
+        while self._queues and self._active < self._max_concurrency:
+            user_id, queue = next(iter(self._queues.items()))
+            waiter = queue[0]
+
+            delay = self._seconds_until_budget(waiter.estimated_tokens)
+            if delay > 0:
+                self._retry_handle = asyncio.get_running_loop().call_later(
+                    delay, self._dispatch
+                )
+                return
+
+            queue.popleft()
+            # Move user to the back of the rotation, or drop them if nothing is left
+            self._queues.pop(user_id)
+            if queue:
+                self._queues[user_id] = queue
+
+            if waiter.future.done():
+                continue
+
+            self._active += 1
+            self._token_window.append(
+                _TokenCharge(time.monotonic(), waiter.estimated_tokens)
+            )
+            wait_sec = time.monotonic() - waiter.enqueued_at
+            self._admitted += 1
+            self._total_wait_sec += wait_sec
+            self._max_wait_sec = max(self._max_wait_sec, wait_sec)
+            waiter.future.set_result(None)
+
+    def _remove_waiter(self, waiter: _Waiter):
+        queue = self._queues.get(waiter.user_id)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                self._queues.pop(waiter.user_id)
+
+    def _release(self):
+        self._active -= 1
+        if self._retry_handle is None:
+            self._dispatch()
+
+    @asynccontextmanager
+    async def admit(self, user_id: str, estimated_tokens: int):
+        """Wait for an LLM call slot for user_id and hold it for the duration of the block"""
+        waiter = _Waiter(
+            user_id=user_id or "",
+            estimated_tokens=estimated_tokens,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._queues.setdefault(waiter.user_id, deque()).append(waiter)
+        self._max_queue_depth = max(self._max_queue_depth, self.queue_depth)
+        if self._retry_handle is None:
+            self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Slot was granted right before cancellation, give it back
+                self._release()
+            else:
+                self._remove_waiter(waiter)
+            raise
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    def snapshot(self) -> dict:
+        return {
+            "active": self._active,
+            "max_concurrency": self._max_concurrency,
+            "queue_depth": self.queue_depth,
+            "queue_depth_by_user": {
+                user_id: len(queue) for user_id, queue in self._queues.items()
+            },
+            "max_queue_depth": self._max_queue_depth,
+            "tokens_in_last_minute": self._tokens_in_window(),
+            "tokens_per_minute": self._tokens_per_minute,
+            "admitted": self._admitted,
+            "avg_wait_sec": (
+                self._total_wait_sec / self._admitted if self._admitted else 0.0
+            ),
+            "max_wait_sec": self._max_wait_sec,
+        }
+
+
+def estimate_tokens(messages: list) -> int:
+    """Rough token estimate for messages, ~4 characters per token"""
+    chars = 0
+    for message in messages:
+        content = message.content
+        if isinstance(content, str):
+            chars += len(content)
+        else:
+            chars += sum(len(block.get("text", "")) for block in content)
+    return chars // 4
+
+
+llm_scheduler = LlmScheduler(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+)
@@ -0,0 +1,105 @@
+from dataclasses import asdict, dataclass
+
+from langchain_core.messages import AIMessage
+
+
+@dataclass
+class LlmCallUsage:
+    stage: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+    # Full non-streaming call time, not time-to-first-token
+    response_time_sec: float = 0.0
+    max_tokens: int | None = None
+
+    @property
+    def cache_hit(self) -> bool:
+        return self.cache_read_tokens > 0
+
+    @property
+    def uncached_input_tokens(self) -> int:
+        """Input tokens that were not served from the prompt cache"""
+        return max(self.input_tokens - self.cache_read_tokens, 0)
+
+    @classmethod
+    def from_message(
+        cls,
+        stage: str,
+        message: AIMessage,
+        response_time_sec: float,
+        max_tokens: int = None,
+    ) -> "LlmCallUsage":
+        """Build usage from langchain AIMessage.usage_metadata"""
+        usage_metadata = getattr(message, "usage_metadata", None) or {}
+        input_details = usage_metadata.get("input_token_details") or {}
+        return cls(
+            stage=stage,
+            input_tokens=usage_metadata.get("input_tokens", 0),
+            output_tokens=usage_metadata.get("output_tokens", 0),
+            cache_read_tokens=input_details.get("cache_read", 0) or 0,
+            cache_creation_tokens=input_details.get("cache_creation", 0) or 0,
+            response_time_sec=response_time_sec,
+            max_tokens=max_tokens,
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def summarize_usage(calls: list[LlmCallUsage]) -> dict:
+    """Per-result usage summary stored with TranscriptionProcessingResult"""
+    return {
+        "llm_calls": [call.to_dict() for call in calls],
+        "input_tokens": sum(call.input_tokens for call in calls),
+        "output_tokens": sum(call.output_tokens for call in calls),
+        "cache_read_tokens": sum(call.cache_read_tokens for call in calls),
+        "cache_creation_tokens": sum(call.cache_creation_tokens for call in calls),
+        "llm_response_time_sec": sum(call.response_time_sec for call in calls),
+        # No LLM calls means the result came from the memoized result cache
+        "memoized": not calls,
+    }
+
+
+class LlmUsageStats:
+    """Process-wide counters of LLM calls and prompt cache efficiency"""
+
+    def __init__(self):
+        self.calls = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_creation_tokens = 0
+        self.response_time_sec = 0.0
+
+    def record(self, usage: LlmCallUsage):
+        self.calls += 1
+        if usage.cache_hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+        self.input_tokens += usage.input_tokens
+        self.output_tokens += usage.output_tokens
+        self.cache_read_tokens += usage.cache_read_tokens
+        self.cache_creation_tokens += usage.cache_creation_tokens
+        self.response_time_sec += usage.response_time_sec
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_read_tokens": self.cache_read_tokens,
+            "cache_creation_tokens": self.cache_creation_tokens,
+            "avg_response_time_sec": (
+                self.response_time_sec / self.calls if self.calls else 0.0
+            ),
+        }
+
+
+llm_usage_stats = LlmUsageStats()
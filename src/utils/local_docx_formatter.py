@@ -1,10 +1,11 @@
 from docx import Document
 from docx.text.paragraph import Paragraph
 from docx.table import Table, _Cell
-from bs4 import BeautifulSoup
 from docx.shared import RGBColor
 from typing import Union
 
+from src.utils.html_runs import run_spec_cache
+
 
 class LocalDocxFormatter:
     """Class for formatting local docx files"""
@@ -14,8 +15,6 @@ class LocalDocxFormatter:
 
     def apply_html_formatting(self, paragraph: Paragraph, html_text: str) -> None:
         """Applies HTML formatting to the text"""
-        soup = BeautifulSoup(html_text, "html.parser")
-
         # Get font from existing runs in paragraph
         base_font_name = None
         base_font_size = None
@@ -27,33 +26,27 @@ class LocalDocxFormatter:
             if base_font_name and base_font_size:
                 break
 
-        for elem in soup.descendants:
-            if isinstance(elem, str) and elem.strip():
-                new_run = paragraph.add_run(elem)
-
-                # Apply base font from document
-                if base_font_name:
-                    new_run.font.name = base_font_name
-                if base_font_size:
-                    new_run.font.size = base_font_size
-
-                # Looking for parent tags for applying styles
-                parent = elem.parent
-                while parent and parent.name:
-                    if parent.name in ["b", "strong"]:
-                        new_run.bold = True
-                    if parent.name in ["i", "em"]:
-                        new_run.italic = True
-                    if parent.name == "u":
-                        new_run.underline = True
-                    if parent.name == "font":
-                        color = parent.get("color")
-                        if color and color.startswith("#") and len(color) == 7:
-                            r, g, b = [int(color[i : i + 2], 16) for i in (1, 3, 5)]
-                            new_run.font.color.rgb = RGBColor(r, g, b)
-                    parent = parent.parent
-            elif hasattr(elem, "name") and elem.name == "br":
+        for spec in run_spec_cache.get(html_text):
+            if spec.is_break:
                 paragraph.add_run().add_break()
+                continue
+
+            new_run = paragraph.add_run(spec.text)
+
+            # Apply base font from document
+            if base_font_name:
+                new_run.font.name = base_font_name
+            if base_font_size:
+                new_run.font.size = base_font_size
+
+            if spec.style.bold:
+                new_run.bold = True
+            if spec.style.italic:
+                new_run.italic = True
+            if spec.style.underline:
+                new_run.underline = True
+            if spec.style.color:
+                new_run.font.color.rgb = RGBColor.from_string(spec.style.color)
 
     def replace_text_with_formatting(
         self, paragraph: Paragraph, old: str, new: str, html: bool = False
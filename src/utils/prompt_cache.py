@@ -0,0 +1,91 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+from src.common.settings import settings
+
+
+@dataclass
+class CompiledPrompts:
+    stage_one_system_message: str
+    stage_two_system_message: str
+    report_file_url: str
+    version: str
+    updated_at: Optional[datetime]
+    loaded_at: float
+
+
+class PromptCache:
+    """In-process LRU cache of compiled system prompts keyed by user and ReportData.updated_at"""
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self._max_size = max_size
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, CompiledPrompts] = OrderedDict()
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._generations: dict[str, int] = {}
+
+    def _is_fresh(self, entry: CompiledPrompts) -> bool:
+        return (time.monotonic() - entry.loaded_at) < self._ttl_seconds
+
+    def _store(self, key: str, entry: CompiledPrompts):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            evicted_key, _ = self._entries.popitem(last=False)
+            self._locks.pop(evicted_key, None)
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[dict]],
+        compiler: Callable[[dict], CompiledPrompts],
+    ) -> CompiledPrompts:
+        """Return compiled prompts for key, loading them at most once for concurrent callers"""
+        entry = self._entries.get(key)
+        if entry and self._is_fresh(entry):
+            self._entries.move_to_end(key)
+            return entry
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another coroutine may have loaded it while we waited
+            entry = self._entries.get(key)
+            if entry and self._is_fresh(entry):
+                self._entries.move_to_end(key)
+                return entry
+
+            generation = self._generations.get(key, 0)
+            data = await loader()
+            updated_at = data.get("updated_at")
+
+            if entry and updated_at is not None and entry.updated_at == updated_at:
+                # Prompts did not change in MongoDB, skip recompiling
+                entry.loaded_at = time.monotonic()
+                compiled = entry
+            else:
+                compiled = compiler(data)
+
+            # Don't cache a result that was invalidated while loading
+            if self._generations.get(key, 0) == generation:
+                self._store(key, compiled)
+            return compiled
+
+    def invalidate(self, key: str):
+        """Drop cached prompts for key, e.g. after the user edited their report data"""
+        self._generations[key] = self._generations.get(key, 0) + 1
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop all cached prompts"""
+        for key in list(self._entries):
+            self.invalidate(key)
+
+
+prompt_cache = PromptCache(
+    max_size=settings.PROMPT_CACHE_MAX_USERS,
+    ttl_seconds=settings.PROMPT_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,180 @@
+import asyncio
+import multiprocessing
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from openai import AsyncOpenAI
+
+from src.common.settings import settings
+
+
+class Transcriber(ABC):
+    """Speech-to-text backend for audio files and in-memory chunks"""
+
+    name: str = ""
+
+    @property
+    @abstractmethod
+    def signature(self) -> str:
+        """Identifies backend and model, transcripts differ between them"""
+
+    @abstractmethod
+    async def transcribe_file(self, file_path: str) -> str:
+        """Transcribe audio file at file_path"""
+
+    @abstractmethod
+    async def transcribe_buffer(self, audio_data: bytes, filename: str) -> str:
+        """Transcribe encoded audio, filename extension tells the container format"""
+
+    def shutdown(self):
+        pass
+
+
+class OpenAITranscriber(Transcriber):
+    """OpenAI Whisper API"""
+
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str = "whisper-1"):
+        self._client = AsyncOpenAI(api_key=api_key)
+        self._model = model
+
+    @property
+    def signature(self) -> str:
+        return f"{self.name}:{self._model}"
+
+    async def transcribe_file(self, file_path: str) -> str:
+        with open(file_path, "rb") as audio_file:
+            return await self._client.audio.transcriptions.create(
+                model=self._model,
+                file=audio_file,
+                response_format="text",
+            )
+
+    async def transcribe_buffer(self, audio_data: bytes, filename: str) -> str:
+        return await self._client.audio.transcriptions.create(
+            model=self._model,
+            file=(filename, audio_data),
+            response_format="text",
+        )
+
+
+# Model loaded once per local transcriber worker process
+_worker_model = None
+
+
+def _init_local_worker(model_name: str, compute_type: str, cpu_threads: int):
+    global _worker_model
+    # Imported in the worker only, the API backend never loads it
+    from faster_whisper import WhisperModel
+
+    _worker_model = WhisperModel(
+        model_name, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads
+    )
+
+
+def _transcribe_in_worker(audio: str | bytes, beam_size: int) -> str:
+    audio_input = BytesIO(audio) if isinstance(audio, bytes) else audio
+    segments, _ = _worker_model.transcribe(audio_input, beam_size=beam_size)
+    return " ".join(segment.text.strip() for segment in segments)
+
+
+class LocalWhisperTranscriber(Transcriber):
+    """faster-whisper on local CPU cores.
+
+    Decoding is CPU bound, so it runs in a process pool where every worker keeps
+    its own copy of the model. Workers are started on first use.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        model_name: str,
+        workers: int,
+        compute_type: str,
+        cpu_threads: int,
+        beam_size: int,
+    ):
+        self._model_name = model_name
+        self._workers = workers
+        self._compute_type = compute_type
+        self._cpu_threads = cpu_threads
+        self._beam_size = beam_size
+        self._executor = None
+
+    @property
+    def signature(self) -> str:
+        return f"{self.name}:{self._model_name}:{self._compute_type}:{self._beam_size}"
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                # Forking a process with a running event loop and open sockets is unsafe
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_local_worker,
+                initargs=(self._model_name, self._compute_type, self._cpu_threads),
+            )
+        return self._executor
+
+    async def _run(self, audio: str | bytes) -> str:
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            return await loop.run_in_executor(
+                executor, _transcribe_in_worker, audio, self._beam_size
+            )
+        except BrokenProcessPool:
+            if executor is self._executor:
+                # A worker died or failed to load the model, start a fresh pool
+                # for the next chunk instead of failing every later request
+                self.shutdown()
+            raise
+
+    async def transcribe_file(self, file_path: str) -> str:
+        return await self._run(file_path)
+
+    async def transcribe_buffer(self, audio_data: bytes, filename: str) -> str:
+        return await self._run(audio_data)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _build_transcriber(name: str) -> Transcriber:
+    if name == OpenAITranscriber.name:
+        return OpenAITranscriber(api_key=settings.OPENAI_API_KEY)
+    if name == LocalWhisperTranscriber.name:
+        return LocalWhisperTranscriber(
+            model_name=settings.LOCAL_WHISPER_MODEL,
+            workers=settings.LOCAL_WHISPER_WORKERS,
+            compute_type=settings.LOCAL_WHISPER_COMPUTE_TYPE,
+            cpu_threads=settings.LOCAL_WHISPER_CPU_THREADS,
+            beam_size=settings.LOCAL_WHISPER_BEAM_SIZE,
+        )
+    raise ValueError(
+        f"Unknown transcriber backend '{name}', expected one of: "
+        f"{OpenAITranscriber.name}, {LocalWhisperTranscriber.name}"
+    )
+
+
+_transcribers: dict[str, Transcriber] = {}
+
+
+def get_transcriber(name: str = None) -> Transcriber:
+    """Get transcriber by name, defaults to TRANSCRIBER_BACKEND setting"""
+    name = name or settings.TRANSCRIBER_BACKEND
+    if name not in _transcribers:
+        _transcribers[name] = _build_transcriber(name)
+    return _transcribers[name]
+
+
+def shutdown_transcribers():
+    """Stop worker processes of local transcribers"""
+    for transcriber in _transcribers.values():
+        transcriber.shutdown()
@@ -0,0 +1,82 @@
+import hashlib
+
+from src.common.settings import settings
+from src.common.models import TranscriptionCache
+from src.common.db_facade import DatabaseFacade
+from src.utils.transcribers import get_transcriber
+
+
+def hash_audio_file(audio_path: str) -> str:
+    """sha256 of file content, read in blocks. Blocking, run in a thread"""
+    with open(audio_path, "rb") as audio_file:
+        return hashlib.file_digest(audio_file, "sha256").hexdigest()
+
+
+def hash_audio_bytes(audio_data: bytes) -> str:
+    return hashlib.sha256(audio_data).hexdigest()
+
+
+def transcription_settings_signature() -> str:
+    """Settings that change the transcript of a whole recording"""
+    return "|".join(
+        str(value)
+        for value in (
+            get_transcriber().signature,
+            settings.WHISPER_TRANSCODE_PROFILE,
+            settings.WHISPER_CHUNK_TARGET_SEC,
+            settings.WHISPER_CHUNK_OVERLAP_SEC,
+            settings.SILENCE_NOISE_DB,
+            settings.SILENCE_MIN_DURATION_SEC,
+            settings.SILENCE_TRIM_ENABLED,
+            settings.SILENCE_TRIM_MIN_SEC,
+            settings.SILENCE_TRIM_PADDING_SEC,
+        )
+    )
+
+
+class TranscriptCache:
+    """User's transcripts persisted in MongoDB by audio content hash.
+
+    Whole recordings are keyed together with the chunking settings, single
+    chunks only with the transcriber since their bytes are already transcoded.
+    Cache errors are logged and treated as misses.
+    """
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id or ""
+
+    def _build_key(self, scope: str, audio_hash: str) -> str:
+        signature = (
+            transcription_settings_signature()
+            if scope == "audio"
+            else get_transcriber().signature
+        )
+        key_source = "\0".join([self.user_id, scope, signature, audio_hash])
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+    async def get(self, scope: str, audio_hash: str) -> str | None:
+        try:
+            cache_facade = DatabaseFacade(TranscriptionCache)
+            cached = await cache_facade.get_one(
+                cache_key=self._build_key(scope, audio_hash)
+            )
+            if cached:
+                return cached.transcript
+        except Exception as e:
+            print(f"Error reading transcript cache: {str(e)}")
+        return None
+
+    async def put(self, scope: str, audio_hash: str, transcript: str):
+        try:
+            cache_facade = DatabaseFacade(TranscriptionCache)
+            await cache_facade.create(
+                cache_key=self._build_key(scope, audio_hash),
+                user_id=self.user_id,
+                scope=scope,
+                transcript=transcript,
+            )
+        except ValueError:
+            # Concurrent request already stored the same transcript
+            pass
+        except Exception as e:
+            print(f"Error writing transcript cache: {str(e)}")
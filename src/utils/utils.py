@@ -1,23 +1,39 @@
-import subprocess
+import json
 import os
-import tempfile
 import time
 import asyncio
+from contextlib import ExitStack
 from io import BytesIO
 import uuid
+import wave
+from typing import Awaitable, Callable
 
 from docx import Document
-from openai import AsyncOpenAI
 from dotenv import load_dotenv
 from pydub import AudioSegment
 
 from src.common.settings import settings
 from src.common.models import ReportData
 from src.common.db_facade import DatabaseFacade
+from src.utils.audio_spool import audio_spool
+from src.utils.transcribers import get_transcriber
+from src.utils.transcript_cache import TranscriptCache, hash_audio_bytes, hash_audio_file
+from src.utils.audio_profiles import TranscodeProfile, get_transcode_profile
+from src.utils.audio_chunking import (
+    AudioChunk,
+    SilenceTrim,
+    Transcription,
+    build_trimmed_segments,
+    join_transcriptions,
+    parse_silences,
+    plan_chunks,
+    plan_speech_segments,
+)
 
 load_dotenv()
 
-openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+# Receives pipeline stage name and stage details, e.g. ("transcribe", {"chunks_done": 1})
+ProgressCallback = Callable[[str, dict], Awaitable[None]]
 
 
 def extract_text_from_docx(docx_bytes: bytes) -> str:
@@ -58,6 +74,7 @@ async def load_prompt_files(user_id: str) -> dict:
         "important_notes": report_data.important_notes,
         "words_spelling": report_data.words_spelling,
         "report_file_url": report_file_url,
+        "updated_at": report_data.updated_at,
     }
 
 
@@ -116,174 +133,507 @@ def clean_json_from_response(response: str) -> str:
     return res.rstrip("```").strip()
 
 
-async def transcribe_audio_with_openai(audio_bytes: bytes, filename: str) -> str:
-    """Transcribe audio using OpenAI's Whisper API with 10-minute chunking"""
+async def transcribe_audio_bytes(
+    audio_bytes: bytes, filename: str, on_progress: ProgressCallback = None
+) -> str:
+    """Transcribe in-memory audio with silence-aware chunking"""
+    file_ext = os.path.splitext(filename)[1] if filename else ".mp3"
+    # ffmpeg needs a seekable input, keep it on tmpfs when it fits
+    with audio_spool.reserve(file_ext, len(audio_bytes)) as audio_path:
+        await asyncio.to_thread(write_audio_file, audio_path, audio_bytes)
+        transcription = await transcribe_audio_file(audio_path, on_progress=on_progress)
+        return transcription.text
+
+
+async def transcribe_audio_file(
+    audio_path: str,
+    on_progress: ProgressCallback = None,
+    transcript_cache: TranscriptCache = None,
+) -> Transcription:
+    """Transcribe audio file with the configured transcriber and silence-aware chunking.
+
+    The file is only read, it stays owned by the caller. With transcript_cache,
+    chunks are looked up by the hash of their transcoded bytes first, so after a
+    failure only the chunks that weren't transcribed are sent again. Each chunk
+    is retried on its own, chunks that still fail are marked as gaps in a
+    partial transcription. Raises if no chunk could be transcribed.
+    """
     try:
-        # Create temporary file
-        file_ext = os.path.splitext(filename)[1] if filename else ".mp3"
-        temp_file_path = create_temp_audio_file(audio_bytes, file_ext)
-
-        try:
-            # Split audio into 10-minute chunks
-            chunk_paths = split_audio_into_chunks(
-                temp_file_path, chunk_length_minutes=10
-            )
-
-            if not chunk_paths:
+        # Every scratch file and chunk registered on the stack is removed on exit,
+        # also when a chunk transcription fails
+        with ExitStack() as stack:
+            source_path = audio_path
+            trim = None
+
+            # Drop long non-speech spans so Whisper gets fewer seconds
+            if settings.SILENCE_TRIM_ENABLED:
+                if on_progress:
+                    await on_progress("trim", {})
+                trim = await trim_long_silences(source_path, stack)
+                if trim:
+                    source_path = trim.path
+                    if on_progress:
+                        await on_progress(
+                            "trim",
+                            {
+                                "original_sec": trim.original_duration,
+                                "dropped_sec": trim.dropped_sec,
+                            },
+                        )
+
+            # Split audio into short chunks cut at silences
+            if on_progress:
+                await on_progress("split", {})
+            split_start_time = time.perf_counter()
+            chunks = await split_audio_into_chunks(source_path)
+            stack.callback(cleanup_audio_chunks, chunks)
+            split_wall_time_sec = time.perf_counter() - split_start_time
+
+            if not chunks:
                 # If no chunks created (audio too short), transcribe directly
-                transcription = await transcribe_with_file(temp_file_path)
+                if on_progress:
+                    await on_progress(
+                        "transcribe",
+                        {
+                            "chunks_done": 0,
+                            "chunks_total": 1,
+                            "split_wall_time_sec": split_wall_time_sec,
+                        },
+                    )
+                transcription = await retry_transcription(
+                    lambda: transcribe_with_file(source_path), "audio"
+                )
+                return Transcription(text=transcription)
+
+            chunks_done = 0
+            chunks_failed = 0
+
+            async def transcribe_chunk(index: int, chunk: AudioChunk) -> str | None:
+                nonlocal chunks_done, chunks_failed
+                try:
+                    transcription = await retry_transcription(
+                        lambda: transcribe_audio_chunk(chunk, transcript_cache),
+                        f"chunk {index + 1}/{len(chunks)}",
+                    )
+                    chunks_done += 1
+                except Exception as e:
+                    print(f"Giving up on chunk {index + 1}/{len(chunks)}: {str(e)}")
+                    transcription = None
+                    chunks_failed += 1
+                if on_progress:
+                    await on_progress(
+                        "transcribe",
+                        {
+                            "chunks_done": chunks_done,
+                            "chunks_failed": chunks_failed,
+                            "chunks_total": len(chunks),
+                        },
+                    )
                 return transcription
 
+            if on_progress:
+                await on_progress(
+                    "transcribe",
+                    {
+                        "chunks_done": 0,
+                        "chunks_total": len(chunks),
+                        "split_wall_time_sec": split_wall_time_sec,
+                    },
+                )
+
             # Transcribe all chunks in parallel using asyncio.gather
             transcription_tasks = [
-                transcribe_with_file(chunk_path) for chunk_path in chunk_paths
+                transcribe_chunk(index, chunk) for index, chunk in enumerate(chunks)
             ]
             transcriptions = await asyncio.gather(*transcription_tasks)
-
-            # Clean up chunk files
-            for chunk_path in chunk_paths:
-                cleanup_temp_file(chunk_path)
-
-            # Join all transcriptions
-            full_transcription = " ".join(transcriptions)
+            if chunks_failed == len(chunks):
+                raise RuntimeError(f"All {len(chunks)} audio chunks failed to transcribe")
+
+            # Join all transcriptions, dropping text repeated in chunk overlaps
+            full_transcription = join_transcriptions(
+                transcriptions,
+                chunks,
+                to_original_time=trim.to_original_time if trim else None,
+            )
+            if full_transcription.is_partial:
+                print(
+                    f"Partial transcription, {chunks_failed}/{len(chunks)} chunks "
+                    f"missing: {full_transcription.gaps}"
+                )
             return full_transcription
 
-        finally:
-            # Clean up main temporary file
-            cleanup_temp_file(temp_file_path)
-
     except Exception as e:
         print(f"Error in audio transcription: {str(e)}")
         raise
-    
 
-def split_audio_ffmpeg(audio_file_path: str, chunk_length_minutes: int = 10):
-    os.makedirs("temp", exist_ok=True)
-    
-    session_id = uuid.uuid4().hex[:8]
-    chunk_length_sec = chunk_length_minutes * 60
 
-    result = subprocess.run(
-        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of",
-         "default=noprint_wrappers=1:nokey=1", audio_file_path],
-        capture_output=True, text=True
-    )
-    duration = float(result.stdout.strip())
-    ext = "mp3"
-    chunk_paths = []
+async def retry_transcription(
+    transcribe: Callable[[], Awaitable[str]], description: str
+) -> str:
+    """Retry a transcription call with exponential backoff, raise the last error"""
+    max_attempts = settings.TRANSCRIPTION_MAX_ATTEMPTS
+    for attempt in range(max_attempts):
+        try:
+            return await transcribe()
+        except Exception as e:
+            if attempt == max_attempts - 1:
+                raise
+            delay = settings.TRANSCRIPTION_RETRY_BACKOFF_SEC * 2**attempt
+            print(
+                f"Transcription of {description} failed (attempt {attempt + 1}/"
+                f"{max_attempts}), retrying in {delay:.1f}s: {str(e)}"
+            )
+            await asyncio.sleep(delay)
 
+
+# Codecs that can be cut without re-encoding, mapped to the chunk file extension
+STREAM_COPY_CODECS = {"mp3": "mp3", "aac": "m4a"}
+
+
+async def run_subprocess(*args: str) -> tuple[bytes, bytes]:
+    """Run subprocess without blocking the event loop and return its stdout and stderr"""
+    process = await asyncio.create_subprocess_exec(
+        *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
     try:
-        for i in range(0, int(duration), chunk_length_sec):
-            chunk_path = f"temp/chunk_{session_id}_{i//chunk_length_sec}.{ext}"
-            subprocess.run([
-                "ffmpeg", "-y",
-                "-hide_banner", "-loglevel", "error",
-                "-ss", str(i),
-                "-t", str(chunk_length_sec),
-                "-i", audio_file_path,
-                "-ar", "44100",
-                "-ac", "2",
-                "-b:a", "192k",
-                chunk_path
-            ], check=True)
-            chunk_paths.append(chunk_path)
-        
-        return chunk_paths
-    
-    except Exception as e:
-        # Если что-то пошло не так, удаляем созданные файлы
-        for path in chunk_paths:
-            if os.path.exists(path):
-                os.remove(path)
-        raise e
-
-def split_audio_into_chunks(
-    audio_file_path: str, chunk_length_minutes: int = 10,
-) -> list:
-    """Split audio file into chunks of specified length in minutes"""
-    try:
-        return split_audio_ffmpeg(audio_file_path, chunk_length_minutes)
-        # # Load audio file
-        # audio = AudioSegment.from_file(audio_file_path)
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+
+    if process.returncode != 0:
+        raise RuntimeError(
+            f"{args[0]} exited with code {process.returncode}: "
+            f"{stderr.decode(errors='ignore').strip()}"
+        )
+    return stdout, stderr
+
+
+async def probe_audio(audio_file_path: str) -> dict:
+    """Get duration in seconds and codec of the first audio stream with ffprobe"""
+    stdout, _ = await run_subprocess(
+        "ffprobe", "-v", "error",
+        "-select_streams", "a:0",
+        "-show_entries", "format=duration:stream=codec_name",
+        "-of", "json",
+        audio_file_path,
+    )
+    probe = json.loads(stdout)
+    streams = probe.get("streams") or [{}]
+    return {
+        "duration": float(probe["format"]["duration"]),
+        "codec": streams[0].get("codec_name"),
+    }
+
+
+async def detect_silences(
+    audio_file_path: str, duration: float, min_duration_sec: float = None
+) -> list[tuple[float, float]]:
+    """Detect silence spans with ffmpeg silencedetect filter"""
+    min_duration_sec = min_duration_sec or settings.SILENCE_MIN_DURATION_SEC
+    _, stderr = await run_subprocess(
+        "ffmpeg", "-hide_banner", "-nostats",
+        "-i", audio_file_path,
+        "-map", "0:a:0",
+        "-af", f"silencedetect=noise={settings.SILENCE_NOISE_DB}dB:d={min_duration_sec}",
+        "-f", "null", "-",
+    )
+    return parse_silences(stderr.decode(errors="ignore"), duration)
+
+
+# Raw audio format used for live dictation segments, what Whisper works with internally
+PCM_SAMPLE_RATE = 16000
+PCM_BYTES_PER_SEC = PCM_SAMPLE_RATE * 2
+
 
-        # # Convert minutes to milliseconds
-        # chunk_length_ms = chunk_length_minutes * 60 * 1000
+async def decode_pcm_with_silences(
+    audio_file_path: str, start_sec: float = 0.0
+) -> tuple[bytes, list[tuple[float, float]]]:
+    """Decode audio after start_sec to 16 kHz mono s16le and detect its silences in one pass.
 
-        # # If audio is shorter than chunk length, return empty list (will use original file)
-        # if len(audio) <= chunk_length_ms:
-        #     return []
+    Silence times are relative to start_sec.
+    """
+    stdout, stderr = await run_subprocess(
+        "ffmpeg", "-hide_banner", "-nostats",
+        "-ss", f"{start_sec:.3f}",
+        "-i", audio_file_path,
+        "-map", "0:a:0",
+        "-af", f"silencedetect=noise={settings.SILENCE_NOISE_DB}dB:d={settings.SILENCE_MIN_DURATION_SEC}",
+        "-ar", str(PCM_SAMPLE_RATE), "-ac", "1",
+        "-f", "s16le", "pipe:1",
+    )
+    silences = parse_silences(stderr.decode(errors="ignore"), len(stdout) / PCM_BYTES_PER_SEC)
+    return stdout, silences
+
+
+def pcm_to_wav(pcm: bytes) -> bytes:
+    """Wrap 16 kHz mono s16le audio into a WAV container"""
+    wav_buffer = BytesIO()
+    with wave.open(wav_buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(PCM_SAMPLE_RATE)
+        wav_file.writeframes(pcm)
+    return wav_buffer.getvalue()
+
+
+async def trim_long_silences(audio_file_path: str, stack: ExitStack) -> SilenceTrim | None:
+    """Remove silences longer than SILENCE_TRIM_MIN_SEC before transcription.
+
+    The trimmed file is spooled and removed when stack is closed.
+    Returns None when there is nothing worth trimming.
+    """
+    start_time = time.perf_counter()
+    probe = await probe_audio(audio_file_path)
+    silences = await detect_silences(
+        audio_file_path, probe["duration"], settings.SILENCE_TRIM_MIN_SEC
+    )
+    keep = plan_speech_segments(
+        probe["duration"],
+        silences,
+        min_silence_sec=settings.SILENCE_TRIM_MIN_SEC,
+        padding_sec=settings.SILENCE_TRIM_PADDING_SEC,
+    )
+    segments = build_trimmed_segments(keep)
+    trimmed_sec = sum(segment.duration for segment in segments)
+    if not keep or probe["duration"] - trimmed_sec < settings.SILENCE_TRIM_MIN_SEC:
+        return None
+
+    # 16 kHz mono 16-bit PCM is an upper bound for the flac output
+    trim = SilenceTrim(
+        path=stack.enter_context(
+            audio_spool.reserve(".flac", int(trimmed_sec * 16000 * 2))
+        ),
+        original_duration=probe["duration"],
+        segments=segments,
+    )
 
-        # chunk_paths = []
-        # total_chunks = len(audio) // chunk_length_ms + (
-        #     1 if len(audio) % chunk_length_ms > 0 else 0
-        # )
+    select_expr = "+".join(f"between(t,{start:.3f},{end:.3f})" for start, end in keep)
+    # Lossless intermediate, chunks are encoded with the Whisper profile afterwards
+    await run_subprocess(
+        "ffmpeg", "-y",
+        "-hide_banner", "-loglevel", "error",
+        "-i", audio_file_path,
+        "-map", "0:a:0",
+        "-af", f"aselect='{select_expr}',asetpts=N/SR/TB",
+        "-ar", "16000", "-ac", "1",
+        "-c:a", "flac",
+        trim.path,
+    )
+
+    print(
+        f"Trimmed {trim.dropped_sec:.0f}s of silence from {trim.original_duration:.0f}s "
+        f"of audio ({len(keep)} speech segments) in {time.perf_counter() - start_time:.2f}s"
+    )
+    return trim
 
-        # print(
-        #     f"Splitting audio into {total_chunks} chunks of {chunk_length_minutes} minutes each"
-        # )
 
-        # # Create temp directory if it doesn't exist
-        # temp_dir = "temp"
-        # os.makedirs(temp_dir, exist_ok=True)
+# Muxer arguments for writing chunks to ffmpeg stdout, mp4 must be fragmented
+# because the muxer can't seek back to write the index
+PIPE_MUXER_ARGS = {
+    "mp3": ("-f", "mp3"),
+    "ogg": ("-f", "ogg"),
+    "flac": ("-f", "flac"),
+    "m4a": ("-f", "mp4", "-movflags", "frag_keyframe+empty_moov"),
+}
 
-        # for i in range(0, len(audio), chunk_length_ms):
-        #     chunk = audio[i : i + chunk_length_ms]
 
-        #     # Create temporary file for chunk in temp directory
-        #     chunk_file_ext = os.path.splitext(audio_file_path)[1]
-        #     with tempfile.NamedTemporaryFile(
-        #         delete=False, suffix=chunk_file_ext, dir=temp_dir
-        #     ) as chunk_file:
-        #         chunk_path = chunk_file.name
+def chunk_codec_args(profile: TranscodeProfile) -> list[str]:
+    """Encoder arguments of a transcoding profile for chunk extraction.
 
-        #     # Export chunk to file
-        #     chunk.export(
-        #         chunk_path, format=chunk_file_ext[1:]
-        #     )  # Remove the dot from extension
-        #     chunk_paths.append(chunk_path)
+    Encoders write their version into the stream unless told to be bit-exact,
+    chunks must have the same bytes on every run to be found in the transcript cache.
+    """
+    return [*profile.codec_args, "-flags:a", "+bitexact"]
 
-        # return chunk_paths
 
+async def extract_audio_chunk(
+    audio_file_path: str, chunk: AudioChunk, codec_args: list[str]
+):
+    """Extract a single chunk with input seeking, so only its own range is decoded.
+
+    Chunks without a path are read from ffmpeg stdout into chunk.data. Muxers
+    run bit-exact, e.g. the Ogg muxer would otherwise pick a random stream serial
+    number, so extracting the same chunk twice gives the same bytes.
+    """
+    output_args = (
+        [chunk.path] if chunk.path else [*PIPE_MUXER_ARGS[chunk.ext], "pipe:1"]
+    )
+    stdout, _ = await run_subprocess(
+        "ffmpeg", "-y",
+        "-hide_banner", "-loglevel", "error",
+        "-ss", f"{chunk.start:.3f}",
+        "-t", f"{chunk.duration:.3f}",
+        "-i", audio_file_path,
+        "-map", "0:a:0",
+        *codec_args,
+        "-fflags", "+bitexact",
+        *output_args,
+    )
+    if not chunk.path:
+        chunk.data = stdout
+
+
+async def split_audio_ffmpeg(
+    audio_file_path: str,
+    profile: TranscodeProfile = None,
+    target_chunk_sec: float = None,
+    in_memory: bool = None,
+) -> list[AudioChunk]:
+    """Split audio into chunks cut at silences near target_chunk_sec.
+
+    Chunks are transcoded with the given profile, or stream copied when the
+    profile is "copy" and the codec allows. With stream copy, an empty list is
+    returned when the audio fits into a single chunk. In-memory chunks are
+    kept in chunk.data, otherwise they are written to temp/. Either way the
+    caller releases them with cleanup_audio_chunks.
+    """
+    profile = profile or get_transcode_profile()
+    target_chunk_sec = target_chunk_sec or settings.WHISPER_CHUNK_TARGET_SEC
+    if in_memory is None:
+        in_memory = settings.AUDIO_IN_MEMORY_CHUNKS
+    search_window_sec = target_chunk_sec * 0.25
+    session_id = uuid.uuid4().hex[:8]
+    start_time = time.perf_counter()
+
+    probe = await probe_audio(audio_file_path)
+    copy_ext = STREAM_COPY_CODECS.get(probe["codec"])
+    if profile.is_stream_copy and copy_ext:
+        if probe["duration"] <= target_chunk_sec + search_window_sec:
+            print(f"Audio is {probe['duration']:.0f}s long, no split needed")
+            return []
+        ext = copy_ext
+        codec_args = ["-c", "copy"]
+    else:
+        if profile.is_stream_copy:
+            # Codec can't be stream copied, fall back to mp3 at original quality
+            profile = get_transcode_profile("mp3_stereo_192k")
+        ext = profile.ext
+        codec_args = chunk_codec_args(profile)
+
+    silences = []
+    if probe["duration"] > target_chunk_sec + search_window_sec:
+        silences = await detect_silences(audio_file_path, probe["duration"])
+    chunks = plan_chunks(
+        probe["duration"],
+        silences,
+        target_sec=target_chunk_sec,
+        search_window_sec=search_window_sec,
+        overlap_sec=settings.WHISPER_CHUNK_OVERLAP_SEC,
+    )
+    if not in_memory:
+        os.makedirs("temp", exist_ok=True)
+    for i, chunk in enumerate(chunks):
+        chunk.ext = ext
+        if not in_memory:
+            chunk.path = f"temp/chunk_{session_id}_{i:03d}.{ext}"
+
+    semaphore = asyncio.Semaphore(settings.AUDIO_SPLIT_CONCURRENCY)
+
+    async def extract(chunk: AudioChunk):
+        async with semaphore:
+            await extract_audio_chunk(audio_file_path, chunk, codec_args)
+
+    try:
+        await asyncio.gather(*[extract(chunk) for chunk in chunks])
+    except BaseException:
+        # Remove partially written chunks
+        cleanup_audio_chunks(chunks)
+        raise
+
+    hard_cuts = sum(1 for chunk in chunks if chunk.overlap_before > 0)
+    print(
+        f"Split {probe['duration']:.0f}s of {probe['codec']} audio into "
+        f"{len(chunks)} {'in-memory' if in_memory else 'file'} chunks "
+        f"({len(silences)} silences, {hard_cuts} hard cuts, profile {profile.name}) "
+        f"in {time.perf_counter() - start_time:.2f}s"
+    )
+    return chunks
+
+
+async def split_audio_into_chunks(
+    audio_file_path: str,
+    profile: TranscodeProfile = None,
+    target_chunk_sec: float = None,
+    in_memory: bool = None,
+) -> list[AudioChunk]:
+    """Split audio file into chunks of about target_chunk_sec seconds"""
+    try:
+        return await split_audio_ffmpeg(
+            audio_file_path, profile, target_chunk_sec, in_memory
+        )
     except Exception as e:
         print(f"Error splitting audio into chunks: {str(e)}")
         raise
 
 
-def create_temp_audio_file(audio_bytes: bytes, file_ext: str) -> str:
-    """Create a temporary audio file in temp directory and return its path"""
+def cleanup_audio_chunks(chunks: list[AudioChunk]):
+    """Remove chunk files and release in-memory chunk data"""
+    for chunk in chunks:
+        chunk.data = None
+        if chunk.path and os.path.exists(chunk.path):
+            cleanup_temp_file(chunk.path)
+
+
+def write_audio_file(file_path: str, audio_bytes: bytes, append: bool = False):
+    """Write audio bytes to file, run in a thread to keep the event loop free"""
+    with open(file_path, "ab" if append else "wb") as audio_file:
+        audio_file.write(audio_bytes)
+
+
+async def transcribe_audio_chunk(
+    chunk: AudioChunk, transcript_cache: TranscriptCache = None
+) -> str:
+    """Transcribe chunk from memory, or from its file when written to disk"""
+    chunk_hash = None
+    if transcript_cache:
+        if chunk.data is not None:
+            chunk_hash = hash_audio_bytes(chunk.data)
+        else:
+            chunk_hash = await asyncio.to_thread(hash_audio_file, chunk.path)
+        cached = await transcript_cache.get("chunk", chunk_hash)
+        if cached is not None:
+            return cached
+
+    if chunk.data is not None:
+        transcription = await transcribe_with_buffer(chunk.data, f"chunk.{chunk.ext}")
+    else:
+        transcription = await transcribe_with_file(chunk.path)
+
+    if transcript_cache:
+        await transcript_cache.put("chunk", chunk_hash, transcription)
+    return transcription
+
+
+async def transcribe_with_buffer(audio_data: bytes, filename: str) -> str:
+    """Transcribe in-memory audio with the configured backend, filename tells the format"""
+    transcriber = get_transcriber()
     try:
-        # Create temp directory if it doesn't exist
-        temp_dir = "temp"
-        os.makedirs(temp_dir, exist_ok=True)
-
-        # Create temp file with proper extension in temp directory
-        with tempfile.NamedTemporaryFile(
-            delete=False, suffix=file_ext, dir=temp_dir
-        ) as temp_file:
-            temp_file.write(audio_bytes)
-            return temp_file.name
+        print(
+            f"Transcribing in-memory audio with {transcriber.name}: "
+            f"{filename} ({len(audio_data)} bytes)"
+        )
+        transcript = await transcriber.transcribe_buffer(audio_data, filename)
+        print("Audio transcription completed successfully")
+        return transcript
+
     except Exception as e:
-        print(f"Error creating temp file: {str(e)}")
+        print(f"Error in {transcriber.name} transcription: {str(e)}")
         raise
 
 
 async def transcribe_with_file(file_path: str) -> str:
-    """Transcribe audio file using OpenAI API"""
+    """Transcribe audio file with the configured backend"""
+    transcriber = get_transcriber()
     try:
-        print(f"Transcribing audio file: {file_path}")
-
-        with open(file_path, "rb") as audio_file:
-            transcript = await openai_client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                response_format="text",
-            )
-
+        print(f"Transcribing audio file with {transcriber.name}: {file_path}")
+        transcript = await transcriber.transcribe_file(file_path)
         print("Audio transcription completed successfully")
         return transcript
 
     except Exception as e:
-        print(f"Error in OpenAI transcription: {str(e)}")
+        print(f"Error in {transcriber.name} transcription: {str(e)}")
         raise
 
 
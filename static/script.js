@@ -573,7 +573,7 @@ async function downloadSingleDocx(index, btnElement) {
             requestBody.patient_name = patientName;
         }
         
-        const response = await fetch('/api/download_docx', {
+        const response = await fetch('/api/download_docx_file', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -582,20 +582,17 @@ async function downloadSingleDocx(index, btnElement) {
         });
         
         if (response.ok) {
-            const responseData = await response.json();
-            
-            if (responseData.error) {
-                throw new Error(responseData.error);
-            }
-            
             // Download the DOCX file
-            const base64Data = responseData.docx_base64;
-            const filename = responseData.filename || 'medical_report.docx';
+            const blob = await response.blob();
+            const filename = filenameFromContentDisposition(
+                response.headers.get('Content-Disposition')
+            ) || 'medical_report.docx';
             
-            downloadBase64AsDocx(base64Data, filename);
+            downloadBlob(blob, filename);
             
         } else {
-            throw new Error('DOCX generation failed');
+            const responseData = await response.json().catch(() => ({}));
+            throw new Error(responseData.error || 'DOCX generation failed');
         }
         
     } catch (error) {
@@ -606,17 +603,21 @@ async function downloadSingleDocx(index, btnElement) {
     }
 }
 
-// Helper function to download base64 as DOCX
-function downloadBase64AsDocx(base64Data, filename) {
-    // Convert base64 to blob and download
-    const byteCharacters = atob(base64Data);
-    const byteNumbers = new Array(byteCharacters.length);
-    for (let i = 0; i < byteCharacters.length; i++) {
-        byteNumbers[i] = byteCharacters.charCodeAt(i);
+// Helper function to read filename from Content-Disposition, preferring the UTF-8 form
+function filenameFromContentDisposition(header) {
+    if (!header) {
+        return null;
     }
-    const byteArray = new Uint8Array(byteNumbers);
-    const blob = new Blob([byteArray], { type: 'application/vnd.openxmlformats-officedocument.wordprocessingml.document' });
-    
+    const utf8Match = header.match(/filename\*=UTF-8''([^;]+)/i);
+    if (utf8Match) {
+        return decodeURIComponent(utf8Match[1]);
+    }
+    const asciiMatch = header.match(/filename="([^"]+)"/i);
+    return asciiMatch ? asciiMatch[1] : null;
+}
+
+// Helper function to download a blob under filename
+function downloadBlob(blob, filename) {
     // Create download link
     const url = window.URL.createObjectURL(blob);
     const a = document.createElement('a');
@@ -638,9 +639,9 @@ document.getElementById('downloadAllDocxBtn').addEventListener('click', async fu
     btn.textContent = 'Generating All DOCX...';
     
     try {
-        const downloadPromises = [];
+        const results = [];
         
-        // Download each form's DOCX
+        // Collect each form's data
         for (let i = 0; i < currentJsonDataArray.length; i++) {
             const form = document.querySelector(`form.editable-form[data-index="${i}"]`);
             const formData = new FormData(form);
@@ -664,45 +665,35 @@ document.getElementById('downloadAllDocxBtn').addEventListener('click', async fu
                 patientName = textOnly.split('\n')[0].trim();
             }
             
-            // Send to download_docx endpoint
-            const requestBody = {
+            const result = {
                 data: updatedData
             };
             if (patientName) {
-                requestBody.patient_name = patientName;
+                result.patient_name = patientName;
             }
-            
-            const downloadPromise = fetch('/api/download_docx', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(requestBody)
-            }).then(response => {
-                if (response.ok) {
-                    return response.json().then(data => {
-                        if (data.error) throw new Error(data.error);
-                        const filename = data.filename || `result_${i + 1}_medical_report.docx`;
-                        return { base64: data.docx_base64, filename };
-                    });
-                } else {
-                    throw new Error(`Failed to generate DOCX for ${currentJsonDataArray[i].source_filename}`);
-                }
-            });
-            
-            downloadPromises.push(downloadPromise);
+            results.push(result);
         }
         
-        // Wait for all DOCX files to be generated
-        const results = await Promise.all(downloadPromises);
-        
-        // Download each file
-        results.forEach(result => {
-            setTimeout(() => {
-                downloadBase64AsDocx(result.base64, result.filename);
-            }, 100); // Small delay between downloads
+        // Render all documents in one request, returned as a ZIP archive
+        const response = await fetch('/api/download_docx_zip', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ results })
         });
         
+        if (!response.ok) {
+            const responseData = await response.json().catch(() => ({}));
+            throw new Error(responseData.error || responseData.detail || 'DOCX generation failed');
+        }
+        
+        const blob = await response.blob();
+        const filename = filenameFromContentDisposition(
+            response.headers.get('Content-Disposition')
+        ) || 'medical_reports.zip';
+        downloadBlob(blob, filename);
+        
     } catch (error) {
         alert('Error generating DOCX files: ' + error.message);
     } finally {
@@ -723,6 +714,9 @@ let recordingStartTime = null;
 let recordingTimer = null;
 let isRecordingPaused = false;
 let pausedTime = 0;
+let liveSocket = null;
+// Timeslice length sent to the live dictation endpoint while recording
+const LIVE_TIMESLICE_MS = 3000;
 
 // Recording UI elements
 const startRecordBtn = document.getElementById('startRecordBtn');
@@ -770,6 +764,60 @@ function resetRecordingUI() {
     pausedTime = 0;
     isRecordingPaused = false;
     audioChunks = [];
+    closeLiveSocket();
+}
+
+// Open live dictation socket, recording is transcribed on the server while in progress
+function openLiveSocket(mimeType) {
+    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    const ext = mimeType.includes('ogg') ? 'ogg' : mimeType.includes('mp4') ? 'mp4' : 'webm';
+    const socket = new WebSocket(`${protocol}//${window.location.host}/api/dictation/live?ext=${ext}`);
+    socket.isHealthy = true;
+    socket.onmessage = function(event) {
+        const message = JSON.parse(event.data);
+        if (message.type === 'transcript') {
+            socket.transcript = message.text;
+        }
+    };
+    socket.onerror = function() {
+        socket.isHealthy = false;
+    };
+    socket.onclose = function() {
+        socket.isHealthy = false;
+    };
+    return socket;
+}
+
+function closeLiveSocket() {
+    if (liveSocket) {
+        if (liveSocket.readyState === WebSocket.OPEN) {
+            liveSocket.send(JSON.stringify({ type: 'discard' }));
+        }
+        liveSocket.close();
+        liveSocket = null;
+    }
+}
+
+// Finish live dictation and wait for the processed result
+function processLiveRecording(socket, processingType, filename) {
+    return new Promise((resolve, reject) => {
+        socket.onmessage = function(event) {
+            const message = JSON.parse(event.data);
+            if (message.type === 'result') {
+                resolve(message.json_data);
+            } else if (message.type === 'error') {
+                reject(new Error(message.error));
+            }
+        };
+        socket.onclose = function() {
+            reject(new Error('Connection closed before processing finished'));
+        };
+        socket.send(JSON.stringify({
+            type: 'process',
+            processing_type: processingType,
+            filename: filename
+        }));
+    });
 }
 
 // Start recording
@@ -782,10 +830,18 @@ startRecordBtn.addEventListener('click', async function() {
         });
         
         audioChunks = [];
+        closeLiveSocket();
+        liveSocket = openLiveSocket(mediaRecorder.mimeType || 'audio/webm');
         
         mediaRecorder.ondataavailable = function(event) {
             if (event.data.size > 0) {
                 audioChunks.push(event.data);
+                if (liveSocket && liveSocket.readyState === WebSocket.OPEN) {
+                    liveSocket.send(event.data);
+                } else if (liveSocket && liveSocket.readyState === WebSocket.CONNECTING) {
+                    // Timeslices only decode in order, fall back to upload when one is missed
+                    liveSocket.isHealthy = false;
+                }
             }
         };
         
@@ -804,7 +860,7 @@ startRecordBtn.addEventListener('click', async function() {
             stream.getTracks().forEach(track => track.stop());
         };
         
-        mediaRecorder.start();
+        mediaRecorder.start(LIVE_TIMESLICE_MS);
         
         recordingStartTime = Date.now();
         pausedTime = 0;
@@ -919,8 +975,25 @@ sendRecordBtn.addEventListener('click', async function() {
     showLoading(loadingText);
     
     try {
-        const formData = new FormData();
         const filename = `recording_${Date.now()}.mp3`;
+
+        // Most of the recording is already transcribed when it was streamed live
+        if (liveSocket && liveSocket.isHealthy && liveSocket.readyState === WebSocket.OPEN) {
+            const socket = liveSocket;
+            liveSocket = null;
+            try {
+                const jsonData = await processLiveRecording(socket, processingType, filename);
+                resetRecordingUI();
+                showMultipleEditableResults([jsonData]);
+                return;
+            } catch (error) {
+                console.error('Live dictation failed, uploading recording:', error);
+            } finally {
+                socket.close();
+            }
+        }
+
+        const formData = new FormData();
         formData.append('files', audioPlayback.recordedBlob, filename);
         formData.append('processing_type', processingType);
         
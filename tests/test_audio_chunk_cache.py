@@ -0,0 +1,74 @@
+import asyncio
+import os
+import shutil
+import subprocess
+
+import pytest
+
+# Required settings, nothing is connected to
+for name, value in {
+    "OPENAI_API_KEY": "test",
+    "ANTHROPIC_API_KEY": "test",
+    "AUTH_SUPERADMIN_EMAIL": "test@example.com",
+    "AUTH_SUPERADMIN_PASSWORD": "test",
+    "MONGODB_URL": "mongodb://127.0.0.1:1",
+    "MONGODB_DB_NAME": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+from src.utils.audio_chunking import AudioChunk
+from src.utils.audio_profiles import TRANSCODE_PROFILES
+from src.utils.transcript_cache import hash_audio_bytes
+from src.utils.utils import chunk_codec_args, extract_audio_chunk
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("ffmpeg") is None, reason="ffmpeg is not installed"
+)
+
+
+@pytest.fixture(scope="module")
+def recording(tmp_path_factory) -> str:
+    path = str(tmp_path_factory.mktemp("audio") / "recording.m4a")
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "sine=frequency=300:duration=20",
+            "-c:a",
+            "aac",
+            path,
+        ],
+        check=True,
+    )
+    return path
+
+
+def extract_chunk_key(recording: str, ext: str, codec_args: list[str]) -> str:
+    chunk = AudioChunk(start=2.0, end=7.0, ext=ext)
+    asyncio.run(extract_audio_chunk(recording, chunk, codec_args))
+    assert chunk.data
+    return hash_audio_bytes(chunk.data)
+
+
+@pytest.mark.parametrize(
+    "profile",
+    [profile for profile in TRANSCODE_PROFILES.values() if not profile.is_stream_copy],
+    ids=lambda profile: profile.name,
+)
+def test_transcoded_chunk_cache_key_is_stable(recording, profile):
+    codec_args = chunk_codec_args(profile)
+    first_key = extract_chunk_key(recording, profile.ext, codec_args)
+    second_key = extract_chunk_key(recording, profile.ext, codec_args)
+    assert first_key == second_key
+
+
+def test_stream_copied_chunk_cache_key_is_stable(recording):
+    first_key = extract_chunk_key(recording, "m4a", ["-c", "copy"])
+    second_key = extract_chunk_key(recording, "m4a", ["-c", "copy"])
+    assert first_key == second_key
@@ -0,0 +1,163 @@
+import pytest
+
+from src.utils.audio_chunking import (
+    AudioChunk,
+    SilenceTrim,
+    build_trimmed_segments,
+    join_transcriptions,
+    plan_chunks,
+    plan_speech_segments,
+    stitch_overlap,
+)
+
+
+def chunk_spans(chunks: list[AudioChunk]) -> list[tuple[float, float, float]]:
+    return [(chunk.start, chunk.end, chunk.overlap_before) for chunk in chunks]
+
+
+def test_plan_chunks_short_recording_is_one_chunk():
+    chunks = plan_chunks(34.0, [], target_sec=30, search_window_sec=5, overlap_sec=2)
+    assert chunk_spans(chunks) == [(0.0, 34.0, 0.0)]
+
+
+def test_plan_chunks_cuts_in_nearest_silence():
+    silences = [(27.0, 29.0), (33.0, 35.0)]
+    chunks = plan_chunks(
+        50.0, silences, target_sec=30, search_window_sec=5, overlap_sec=2
+    )
+    assert chunk_spans(chunks) == [(0.0, 28.0, 0.0), (28.0, 50.0, 0.0)]
+
+
+def test_plan_chunks_hard_cut_overlaps_next_chunk():
+    # Silence outside the search window is not used
+    silences = [(40.0, 42.0)]
+    chunks = plan_chunks(
+        100.0, silences, target_sec=30, search_window_sec=5, overlap_sec=2
+    )
+    assert chunk_spans(chunks) == [
+        (0.0, 30.0, 0.0),
+        (28.0, 60.0, 2.0),
+        (58.0, 90.0, 2.0),
+        (88.0, 100.0, 2.0),
+    ]
+
+
+@pytest.mark.parametrize(
+    "silences",
+    [[], [(10.0, 11.0), (58.0, 61.0), (95.0, 96.5), (150.0, 150.4)]],
+)
+def test_plan_chunks_cover_recording_without_holes(silences):
+    chunks = plan_chunks(
+        200.0, silences, target_sec=30, search_window_sec=5, overlap_sec=2
+    )
+    assert chunks[0].start == 0.0
+    assert chunks[-1].end == 200.0
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.start + chunk.overlap_before == previous.end
+
+
+def test_stitch_overlap_drops_repeated_words():
+    previous = "The patient was seen today"
+    current = "seen today, for a follow up"
+    assert stitch_overlap(previous, current) == "for a follow up"
+
+
+def test_stitch_overlap_skips_cut_word_fragment():
+    previous = "The patient was seen today"
+    current = "ay seen Today for a follow up"
+    assert stitch_overlap(previous, current) == "for a follow up"
+
+
+def test_stitch_overlap_keeps_text_without_repeat():
+    assert stitch_overlap("The patient was seen", "today for a follow up") == (
+        "today for a follow up"
+    )
+    # A single repeated word may be a real repetition, not overlap
+    assert stitch_overlap("Pain in the knee", "knee pain at night") == (
+        "knee pain at night"
+    )
+
+
+def test_join_transcriptions_stitches_only_overlapping_chunks():
+    chunks = [
+        AudioChunk(start=0.0, end=30.0),
+        AudioChunk(start=28.0, end=60.0, overlap_before=2.0),
+        AudioChunk(start=60.0, end=90.0),
+    ]
+    transcription = join_transcriptions(
+        ["The patient was seen today", "seen today for a follow up", "up to date"],
+        chunks,
+    )
+    assert transcription.text == (
+        "The patient was seen today for a follow up up to date"
+    )
+    assert not transcription.is_partial
+
+
+def test_plan_speech_segments_without_silence_keeps_everything():
+    keep = plan_speech_segments(60.0, [], min_silence_sec=2, padding_sec=0.5)
+    assert keep == [(0.0, 60.0)]
+
+
+def test_plan_speech_segments_ignores_short_silences():
+    # Shorter than min_silence_sec, and too short to drop anything after padding
+    silences = [(10.0, 11.0), (20.0, 20.9)]
+    keep = plan_speech_segments(60.0, silences, min_silence_sec=0.8, padding_sec=0.5)
+    assert keep == [(0.0, 60.0)]
+
+
+def test_plan_speech_segments_trims_leading_and_trailing_silence():
+    silences = [(0.0, 5.0), (55.0, 60.0)]
+    keep = plan_speech_segments(60.0, silences, min_silence_sec=2, padding_sec=0.5)
+    assert keep == [(0.0, 0.5), (4.5, 55.5), (59.5, 60.0)]
+
+
+def test_plan_speech_segments_caps_gap_at_padding():
+    silences = [(10.0, 20.0)]
+    keep = plan_speech_segments(60.0, silences, min_silence_sec=2, padding_sec=0.5)
+    assert keep == [(0.0, 10.5), (19.5, 60.0)]
+    # Speech on both sides keeps padding_sec of the silence each
+    trimmed = SilenceTrim(
+        path="trimmed.ogg",
+        original_duration=60.0,
+        segments=build_trimmed_segments(keep),
+    )
+    assert trimmed.trimmed_duration == 51.0
+    assert trimmed.dropped_sec == 9.0
+
+
+def test_silence_trim_maps_times_to_original_recording():
+    keep = [(0.0, 10.5), (19.5, 60.0)]
+    trimmed = SilenceTrim(
+        path="trimmed.ogg",
+        original_duration=60.0,
+        segments=build_trimmed_segments(keep),
+    )
+    assert trimmed.to_original_time(0.0) == 0.0
+    assert trimmed.to_original_time(5.0) == 5.0
+    assert trimmed.to_original_time(10.5) == 10.5
+    assert trimmed.to_original_time(11.0) == 20.0
+    assert trimmed.to_original_time(51.0) == 60.0
+    assert trimmed.to_original_time(70.0) == 60.0
+
+
+def test_join_transcriptions_reports_gaps_in_original_time():
+    trimmed = SilenceTrim(
+        path="trimmed.ogg",
+        original_duration=60.0,
+        segments=build_trimmed_segments([(0.0, 10.5), (19.5, 60.0)]),
+    )
+    chunks = [
+        AudioChunk(start=0.0, end=10.5),
+        AudioChunk(start=10.5, end=30.5),
+        AudioChunk(start=30.5, end=51.0),
+    ]
+    transcription = join_transcriptions(
+        ["The patient was seen", None, "for a follow up"],
+        chunks,
+        to_original_time=trimmed.to_original_time,
+    )
+    assert transcription.gaps == [(10.5, 39.5)]
+    assert transcription.text == (
+        "The patient was seen [transcription missing 00:10-00:39] for a follow up"
+    )